@@ -0,0 +1,51 @@
+""" Micro-benchmark: execute_script extraction vs the old per-element reader.
+
+Loads a saved club page into a local headless Chrome and times both paths.
+Usage: python Benchmarks/bench_extract.py [fixture.html] [runs]
+"""
+import os
+import sys
+import time
+import statistics
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from utils import extract_members_js, extract_members_elements
+
+DEFAULT_FIXTURE = os.path.join(ROOT, "Benchmarks", "fixtures", "club_30.html")
+
+def time_path(func, driver, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(driver)
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, timings
+
+def main():
+    fixture = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURE
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        driver.get("file://" + os.path.abspath(fixture))
+        fast, fast_ms = time_path(extract_members_js, driver, runs)
+        slow, slow_ms = time_path(extract_members_elements, driver, runs)
+    finally:
+        driver.quit()
+
+    if fast != slow:
+        print("❌ Both paths returned different data!")
+        sys.exit(1)
+
+    print(f"📄 {os.path.basename(fixture)}: {fast[0]} rows, {runs} runs each")
+    for label, ms in (("execute_script", fast_ms), ("find_elements", slow_ms)):
+        print(f"  {label:<15} median {statistics.median(ms):8.2f} ms | best {min(ms):8.2f} ms")
+    print(f"⚡ Speed-up: {statistics.median(slow_ms) / statistics.median(fast_ms):.1f}x")
+
+if __name__ == '__main__':
+    main()
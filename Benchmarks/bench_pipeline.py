@@ -0,0 +1,166 @@
+""" Benchmark + regression check for the scrape -> lookup -> embed -> save pipeline.
+
+Replays the saved club pages (Benchmarks/fixtures, 30/100/300 members, one club each) in a local
+headless Chrome, runs every stage against them with a stub Discord context, and compares the p50
+latencies with Benchmarks/baseline.json. The baseline is per machine: save one before changing code.
+
+Usage:
+    python Benchmarks/bench_pipeline.py                  # compare with the baseline (exit 1 on regression)
+    python Benchmarks/bench_pipeline.py --save-baseline  # store this run as the new baseline
+    options: --runs 20 --threshold 1.5
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+MIN_REGRESSION_MS = 0.5 # Ignore slowdowns smaller than this (timer noise on very fast stages)
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+from make_fixtures import SIZES, fixture_path
+
+
+# --- 1. FAKE BOT SETUP ---
+def setup_environment(workdir):
+    """ One club per fixture, headless mode, and a fresh Data/ folder inside workdir. """
+    clubs = [
+        {"id": i + 1, "name": f"bench{size}", "aliases": [], "port": 9300 + i,
+         "url": "file://" + fixture_path(size), "roles": [], "channel": 0}
+        for i, size in enumerate(SIZES)
+    ]
+    config_file = os.path.join(workdir, "clubs.json")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({"clubs": clubs, "browser": {"mode": "headless"}}, f)
+    os.environ.update({"CLUB_CONFIG": config_file, "BROWSER_MODE": "headless", "STORAGE_BACKEND": "sqlite"})
+    os.chdir(workdir)
+
+class StubMessage:
+    async def delete(self): pass
+    async def edit(self, **kwargs): pass
+
+class StubContext:
+    """ Just enough of commands.Context for the cog commands: messages are recorded, not posted. """
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+        return StubMessage()
+
+
+# --- 2. TIMING ---
+async def call(func):
+    result = func()
+    if asyncio.iscoroutine(result): result = await result
+    return result
+
+async def measure(func, runs):
+    """ Latencies in ms over `runs` calls, plus the Python memory peak (KB) of one extra traced call. """
+    await call(func) # Warm-up (driver connect, caches)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await call(func)
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    await call(func)
+    peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return timings, peak_kb
+
+def percentiles(timings):
+    ordered = sorted(timings)
+    pick = lambda q: ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "max": ordered[-1]}
+
+
+# --- 3. THE STAGES ---
+async def run_benchmarks(runs):
+    import utils
+    from Cogs.Public import Public
+
+    cog = Public(bot=None)
+    results = {}
+    for c_id, size in zip(utils.CLUBS, SIZES):
+        port = utils.get_port(c_id)
+        files = utils.get_filenames(c_id)
+        # Every third member linked, like a real club
+        utils.save_json(files['bind'], {f"Trainer {i:03d}": 1000 + i for i in range(0, size, 3)})
+        title, data = await utils.get_snapshot(port)
+        if title is None: raise RuntimeError(f"Could not read fixture club_{size}: {data}")
+        board = utils.get_leaderboard(port)
+        bindings = utils.load_json(files['bind'])
+        last_name = f"trainer {size - 1:03d}"
+
+        stages = {
+            "read_browser_and_sort": lambda: utils.read_browser_and_sort(port),
+            "check_club": lambda: cog.check_club(last_name, c_id, port),
+            "members_embed": lambda: cog.build_members_embed(board, bindings, title, f"bench{size}"),
+            "members_command": lambda: cog.members.callback(cog, StubContext(), str(c_id)),
+            "weekly_rollover": lambda: utils.weekly_rollover({c_id: data}),
+        }
+        for stage, func in stages.items():
+            timings, peak_kb = await measure(func, runs)
+            results[f"{stage}@{size}"] = {**percentiles(timings), "peak_kb": peak_kb}
+
+    chrome_mb = None
+    if utils._headless['driver'] is not None:
+        chrome_mb = utils._process_tree_rss_mb(utils._headless['driver'].service.process.pid)
+    utils.shutdown_scraper()
+    return results, chrome_mb
+
+
+# --- 4. REPORT ---
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=1.5, help="fail if p50 > baseline p50 x this")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_environment(workdir)
+        results, chrome_mb = asyncio.run(run_benchmarks(args.runs))
+        os.chdir(ROOT)
+
+    regressions = []
+    print(f"{'stage':<32}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'peak KB':>10}{'baseline':>10}")
+    for key, r in results.items():
+        base = baseline.get(key)
+        mark = ""
+        if base is not None:
+            mark = f"{base:.2f}"
+            if r['p50'] > base * args.threshold and r['p50'] - base > MIN_REGRESSION_MS:
+                regressions.append(key)
+                mark += " ❌"
+        print(f"{key:<32}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['max']:>10.2f}{r['peak_kb']:>10.0f}{mark:>10}")
+    if chrome_mb is not None:
+        print(f"🧠 Headless Chrome resident memory: {chrome_mb:.0f} MB")
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({key: round(r['p50'], 3) for key, r in results.items()}, f, indent=4)
+        print(f"💾 Baseline saved to {BASELINE_FILE}")
+    elif not baseline:
+        print("ℹ️ No baseline yet. Run with --save-baseline to store one.")
+    elif regressions:
+        print(f"❌ Slower than baseline x{args.threshold}: {', '.join(regressions)}")
+        sys.exit(1)
+    else:
+        print("✅ No regressions.")
+
+if __name__ == '__main__':
+    main()
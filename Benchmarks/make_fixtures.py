@@ -0,0 +1,45 @@
+""" Writes the saved club pages used by the benchmarks (same output every run).
+Usage: python Benchmarks/make_fixtures.py
+"""
+import os
+import random
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SIZES = {30: "Lunasoul", 100: "Umaclover", 300: "Big Test Club"}
+LOGINS = ["5 minutes ago", "1 hour ago", "3 hours ago", "1 day ago", "2 days ago", "6 days ago"]
+
+ROW = """  <div class="club-member-row-container">
+    <div class="club-profile-cell"><span class="club-profile-name">{name}</span></div>
+    <div class="club-profile-cell"><span class="club-profile-cell-reg-span">{fans:,}</span></div>
+    <div class="club-profile-cell"><span class="club-profile-cell-reg-span">{daily:,}</span></div>
+    <div class="club-profile-cell"><span class="club-profile-cell-reg-span">{login}</span></div>
+  </div>"""
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title} | Club Profile</title></head>
+<body>
+<!-- Generated by make_fixtures.py: only the markup read_browser_and_sort looks at. -->
+<div class="club-member-list">
+{rows}
+</div>
+</body>
+</html>
+"""
+
+def make_page(size, title):
+    rng = random.Random(size)
+    rows = [ROW.format(name=f"Trainer {i:03d}", fans=rng.randint(20_000_000, 400_000_000),
+                       daily=rng.randint(0, 2_500_000), login=rng.choice(LOGINS))
+            for i in range(size)]
+    return PAGE.format(title=title, rows="\n".join(rows))
+
+def fixture_path(size):
+    return os.path.join(FIXTURES, f"club_{size}.html")
+
+if __name__ == '__main__':
+    os.makedirs(FIXTURES, exist_ok=True)
+    for size, title in SIZES.items():
+        with open(fixture_path(size), 'w', encoding='utf-8') as f:
+            f.write(make_page(size, title))
+        print(f"📄 {fixture_path(size)}")
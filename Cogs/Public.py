@@ -1,47 +1,32 @@
 import discord
 from discord.ext import commands
 import typing
+import asyncio
+from datetime import datetime, timedelta
 # Import CLUB_FILENAMES so we can use the pretty names
 from utils import (
-    read_browser_and_sort, load_json, get_filenames, 
-    resolve_club_id, CLUB_FILENAMES
+    get_snapshot, get_leaderboard, get_player_index, snapshot_age, format_age, load_json, get_filenames,
+    resolve_club_id, get_port, for_each_club, get_club_history, club_dashboard, stale_note, CLUB_FILENAMES, FILE_VERSIONS
 )
+from timeseries import member_names, query_history
+import analytics
+from output import reply, pack_embeds, pack_lines
 
 class Public(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.embed_cache = {} # (command, club_id) -> (version, Embed)
 
-    # --- 1. MEMBERS LIST ---
-    @commands.command(aliases=['member'])
-    async def members(self, ctx, club_name_or_id: str = "main"):
-        """ Shows the full Live Leaderboard (Embedded) """
-        
-        # 1. Resolve Club
-        club_id = resolve_club_id(club_name_or_id)
-        if club_id is None:
-            return await ctx.send(f"❌ Unknown Club: **{club_name_or_id}**")
+    def cached_embed(self, command, club_id, version):
+        """ The stored embed if it was built from the same data version, else None. """
+        cached = self.embed_cache.get((command, club_id))
+        return cached[1] if cached and cached[0] == version else None
 
-        pretty_name = CLUB_FILENAMES.get(club_id, f"Club {club_id}")
-        port = 9222 if club_id == 1 else 9223
-        
-        # Temporary "Loading" message
-        loading_msg = await ctx.send(f"🕵️ Reading stats for **{pretty_name}**...")
-        
-        # 2. Scrape Data
-        club_title_from_web, raw_data = read_browser_and_sort(port)
-        
-        if club_title_from_web is None:
-            return await ctx.send(f"❌ {raw_data}")
-
-        files = get_filenames(club_id)
-        bindings = load_json(files['bind'])
-        
+    def build_members_embed(self, board, bindings, club_title_from_web, pretty_name):
         header_name = club_title_from_web if club_title_from_web != "Club" else pretty_name
+        lines = []
         
-        # 3. Build the Text Block
-        description_text = ""
-        
-        for i, p in enumerate(raw_data):
+        for i, p in enumerate(board.members()):
             name = p['name']
             fans = p['fans']
             
@@ -59,23 +44,53 @@ class Public(commands.Cog):
                 display_name = f"{name}"
             
             # Line Format: 🥇 @Kuro: **150,000,000**
-            line = f"{rank_icon} {display_name}: **{fans:,}**\n"
-            
-            description_text += line
+            lines.append(f"{rank_icon} {display_name}: **{fans:,}**\n")
 
-        # 4. Create Embed
-        embed = discord.Embed(
+        return discord.Embed(
             title=f"🏆 {header_name} Leaderboard",
-            description=description_text,
+            description="".join(lines),
             color=discord.Color.gold()
         )
+
+    # --- 1. MEMBERS LIST ---
+    @commands.command(aliases=['member'])
+    async def members(self, ctx, club_name_or_id: str = "main"):
+        """ Shows the full Live Leaderboard (Embedded) """
+        
+        # 1. Resolve Club
+        club_id = resolve_club_id(club_name_or_id)
+        if club_id is None:
+            return await ctx.send(f"❌ Unknown Club: **{club_name_or_id}**")
+
+        pretty_name = CLUB_FILENAMES.get(club_id, f"Club {club_id}")
+        port = get_port(club_id)
         
-        # Add footer with total count
-        embed.set_footer(text=f"Total Members: {len(raw_data)}/30 | Updated: just now")
+        # Temporary "Loading" message
+        loading_msg = await ctx.send(f"🕵️ Reading stats for **{pretty_name}**...")
+        
+        # 2. Scrape Data
+        club_title_from_web, raw_data = await get_snapshot(port)
         
-        # 5. Send (and delete loading message)
-        await loading_msg.delete()
-        await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+        if club_title_from_web is None:
+            return await reply(ctx, loading_msg, content=f"❌ {raw_data}")
+
+        # 3. Build the embed, or reuse it if nothing changed since the last time
+        board = get_leaderboard(port)
+        bind_file = get_filenames(club_id)['bind']
+        version = (board.version, club_title_from_web, FILE_VERSIONS.get(bind_file, 0))
+        embed = self.cached_embed('members', club_id, version)
+        if embed is None:
+            embed = self.build_members_embed(board, load_json(bind_file), club_title_from_web, pretty_name)
+            self.embed_cache[('members', club_id)] = (version, embed)
+
+        # 4. Footer changes every minute, so it goes on a copy
+        embed = embed.copy()
+        embed.set_footer(text=f"Total Members: {len(board.by_name)}/30 | Updated: {format_age(snapshot_age(port))}")
+        note = stale_note(port)
+        if note: embed.description = f"{note}\n\n{embed.description}"
+        
+        # 5. Turn the loading message into the leaderboard
+        await reply(ctx, loading_msg, embed=embed, allowed_mentions=discord.AllowedMentions.none())
 
     # --- 2. PLAYER STATS ---
     @commands.command()
@@ -83,93 +98,57 @@ class Public(commands.Cog):
         """ Stats for one person (Checks All Clubs) """
         if target is None: target = ctx.author
 
-        # Check Club 1 (Port 9222)
-        found = await self.check_club(ctx, target, 1, 9222)
-        if found: return
+        # Search every club at the same time, then show every club they were found in
+        results = await for_each_club(lambda c_id: self.check_club(target, c_id, get_port(c_id)))
+        embeds = [e for e in results if e is not None]
 
-        # Check Club 2 (Port 9223)
-        found = await self.check_club(ctx, target, 2, 9223)
-        
-        if not found:
-            await ctx.send(f"❌ Could not find that player in any active club.")
+        if not embeds:
+            return await ctx.send(f"❌ Could not find that player in any active club.")
+        for group in pack_embeds(embeds): # Up to 10 embeds per message
+            await ctx.send(embeds=group)
 
-    async def check_club(self, ctx, target, club_num, port):
-        files = get_filenames(club_num)
-        bindings = load_json(files['bind'])
-        
-        possible_search_terms = []
-        target_user_display = "Not Linked"
+    async def check_club(self, target, club_num, port):
+        """ Stats embed for the target in this club, or None if they aren't in it. """
+        index = await get_player_index(club_num, port)
+        if index is None: return None
 
         # 1. Identify what we are searching for
+        target_user_display = "Not Linked"
         if isinstance(target, discord.Member) or isinstance(target, discord.User):
             # If they tagged a user, we MUST find the name in bindings first
             target_user_display = target.mention
-            for name, uid in bindings.items():
-                if uid == target.id:
-                    possible_search_terms.append(name)
-            
-            if not possible_search_terms: return False # User is not linked in this club
+            possible_search_terms = index.search_terms(target.id)
+            if not possible_search_terms: return None # User is not linked in this club
         else:
-            # If they typed a string ("yoisaki"), we use that as the search term
-            possible_search_terms.append(target)
-            
-            # Also check if this string is a binding key, and if so, add other aliases
-            if target in bindings:
-                target_uid = bindings[target]
-                for name, uid in bindings.items():
-                    if uid == target_uid and name != target:
-                        possible_search_terms.append(name)
+            # If they typed a string ("yoisaki"), that plus any aliases linked to the same user
+            possible_search_terms = index.search_terms(target)
 
-        # 2. Scrape Data
-        club_title_from_web, raw_data = read_browser_and_sort(port)
-        if not club_title_from_web: return False
+        # 2. Find Player in the List (Case-Insensitive, best rank wins)
+        match = index.find(possible_search_terms)
+        if not match: return None
+        rank, player_data = match
 
-        # 3. Find Player in the List (Case-Insensitive)
-        player_data = None
-        rank = 0
-        
-        for i, p in enumerate(raw_data):
-            # Check if ANY search term is inside the name
-            for term in possible_search_terms:
-                if term.lower() in p['name'].lower():
-                    player_data = p
-                    rank = i + 1
-                    break
-            if player_data:
-                break
-        
-        if player_data:
-            # 4. NOW we check for the Link using the REAL name found in game
-            real_name = player_data['name'] # e.g. "YoiSaki"
-            
-            # Check exact match in bindings
-            if real_name in bindings:
-                target_user_display = f"<@{bindings[real_name]}>"
-            else:
-                # Double check case-insensitive binding
-                for b_name, b_id in bindings.items():
-                    if b_name.lower() == real_name.lower():
-                        target_user_display = f"<@{b_id}>"
-                        break
-            
-            # 5. Calculate Stats
-            weekly_file = load_json(files['json'])
-            gain = player_data['fans'] - weekly_file.get(real_name, player_data['fans'])
-            if gain < 0: gain = 0
-
-            club_name = CLUB_FILENAMES.get(club_num, f"Club {club_num}")
-
-            embed = discord.Embed(title=f"📊 Stats1: {real_name}", color=discord.Color.blue())
-            embed.add_field(name="🏆 Rank", value=f"#{rank} ({club_name})", inline=True)
-            embed.add_field(name="✨ Total Fans", value=f"{player_data['fans']:,}", inline=True)
-            embed.add_field(name="📅 Earned This Week", value=f"+{gain:,}", inline=False)
-            embed.add_field(name="🔗 Discord", value=target_user_display, inline=False)
-            embed.set_footer(text=f"Club: {club_title_from_web}")
-            
-            await ctx.send(embed=embed)
-            return True
-            
-        return False
+        # 3. NOW we check for the Link using the REAL name found in game
+        real_name = player_data['name'] # e.g. "YoiSaki"
+        uid = index.discord_id(real_name)
+        if uid is not None:
+            target_user_display = f"<@{uid}>"
+
+        # 4. Calculate Stats
+        weekly_file = load_json(get_filenames(club_num)['json'])
+        gain = player_data['fans'] - weekly_file.get(real_name, player_data['fans'])
+        if gain < 0: gain = 0
+
+        club_name = CLUB_FILENAMES.get(club_num, f"Club {club_num}")
+
+        embed = discord.Embed(title=f"📊 Stats1: {real_name}", color=discord.Color.blue())
+        embed.add_field(name="🏆 Rank", value=f"#{rank} ({club_name})", inline=True)
+        embed.add_field(name="✨ Total Fans", value=f"{player_data['fans']:,}", inline=True)
+        embed.add_field(name="📅 Earned This Week", value=f"+{gain:,}", inline=False)
+        embed.add_field(name="🔗 Discord", value=target_user_display, inline=False)
+        note = stale_note(port)
+        embed.set_footer(text=f"Club: {index.club_title}" + (f" | {note}" if note else ""))
+        return embed
 
     # --- 3. CLUB STATUS ---
     @commands.command(aliases=['clubstats'])
@@ -181,28 +160,159 @@ class Public(commands.Cog):
 
         club_name = CLUB_FILENAMES.get(club_id, f"Club {club_id}")
 
-        port = 9222 if club_id == 1 else 9223
-        await ctx.send(f"📊 Analyzing **{club_name}**...")
-        
-        club_title_from_web, raw_data = read_browser_and_sort(port)
-        if not club_title_from_web: return await ctx.send(f"❌ {raw_data}")
-
-        # Calc Stats
-        total_fans = sum(p['fans'] for p in raw_data)
-        total_daily = sum(p['daily'] for p in raw_data)
-        member_count = len(raw_data)
-        monthly_est = total_daily * 30
-        
-        embed = discord.Embed(title=f"📈 Club Report: {club_name}", color=discord.Color.gold())
-        
-        embed.add_field(name="👥 Members", value=f"{member_count}/30", inline=True)
-        embed.add_field(name="✨ Total Fans", value=f"{total_fans:,}", inline=True)
-        embed.add_field(name="🔥 Daily Output", value=f"+{total_daily:,} /day", inline=True)
-        embed.add_field(name="📅 Monthly Estimate", value=f"~{monthly_est:,} fans", inline=True)
-        
-        # Footer uses the official name from the game
-        embed.set_footer(text=f"Official Name: {club_title_from_web}")
+        port = get_port(club_id)
+        loading_msg = await ctx.send(f"📊 Analyzing **{club_name}**...")
         
+        club_title_from_web, raw_data = await get_snapshot(port)
+        if not club_title_from_web: return await reply(ctx, loading_msg, content=f"❌ {raw_data}")
+
+        # Stats (totals are kept up to date by the scraper), rebuilt only when they change
+        board = get_leaderboard(port)
+        version = (board.version, club_title_from_web)
+        embed = self.cached_embed('status', club_id, version)
+        if embed is None:
+            total_fans = board.total_fans
+            total_daily = board.total_daily
+            member_count = len(board.by_name)
+            monthly_est = total_daily * 30
+            
+            embed = discord.Embed(title=f"📈 Club Report: {club_name}", color=discord.Color.gold())
+            
+            embed.add_field(name="👥 Members", value=f"{member_count}/30", inline=True)
+            embed.add_field(name="✨ Total Fans", value=f"{total_fans:,}", inline=True)
+            embed.add_field(name="🔥 Daily Output", value=f"+{total_daily:,} /day", inline=True)
+            embed.add_field(name="📅 Monthly Estimate", value=f"~{monthly_est:,} fans", inline=True)
+            
+            # Footer uses the official name from the game
+            embed.set_footer(text=f"Official Name: {club_title_from_web}")
+            self.embed_cache[('status', club_id)] = (version, embed)
+
+        note = stale_note(port)
+        if note:
+            embed = embed.copy()
+            embed.set_footer(text=f"Official Name: {club_title_from_web} | {note}")
+        await reply(ctx, loading_msg, embed=embed)
+
+    # --- 4. FAN HISTORY ---
+    @commands.command()
+    async def history(self, ctx, *, args: str = ""):
+        """ Day-by-day fans for one member: !history <name> [days] """
+        parts = args.split()
+        days = 7
+        if len(parts) > 1 and parts[-1].isdigit():
+            days = max(1, min(int(parts.pop()), 365))
+        search = " ".join(parts)
+        if not search: return await ctx.send("❌ Usage: `!history <name> [days]`")
+
+        since = (datetime.now() - timedelta(days=days)).timestamp()
+
+        # 1. Find the member (exact name first, then partial) in any club.
+        # Month files are read and decompressed in a thread, not on the event loop.
+        def lookup():
+            for c_name in CLUB_FILENAMES.values():
+                names = member_names(c_name, since)
+                exact = [n for n in names if n.lower() == search.lower()]
+                partial = [n for n in names if search.lower() in n.lower()]
+                if exact or partial:
+                    real_name = (exact or sorted(partial))[0]
+                    return c_name, real_name, query_history(c_name, real_name, since)
+            return None
+        found = await asyncio.to_thread(lookup)
+        if not found:
+            return await ctx.send(f"❌ No history for **{search}** in the last {days} days.")
+        club_name, real_name, samples = found
+
+        # 2. Keep the last sample of each day
+        per_day = {}
+        for ts, fans, daily, login in samples:
+            per_day[datetime.fromtimestamp(ts).strftime("%Y-%m-%d")] = fans
+        if not per_day:
+            return await ctx.send(f"❌ No history for **{search}** in the last {days} days.")
+
+        lines = []
+        previous = None
+        for day, fans in per_day.items():
+            gain = f" (+{fans - previous:,})" if previous is not None else ""
+            lines.append(f"`{day}` **{fans:,}**{gain}\n")
+            previous = fans
+        first, last = next(iter(per_day.values())), previous
+
+        embed = discord.Embed(
+            title=f"📈 History: {real_name}",
+            description="".join(lines[-31:]), # Embed text limit: show the last month at most
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="✨ Total Fans", value=f"{last:,}", inline=True)
+        embed.add_field(name=f"📅 Gained ({len(per_day)} days)", value=f"+{max(last - first, 0):,}", inline=True)
+        embed.set_footer(text=f"Club: {club_name} | Hourly samples")
+        await ctx.send(embed=embed)
+
+    # --- 5. WEEKLY TREND ---
+    @commands.command()
+    async def trend(self, ctx, *, args: str = ""):
+        """ Weekly gains, rolling average and projections for one member: !trend <name> [weeks] """
+        if not analytics.AVAILABLE:
+            return await ctx.send("📦 `!trend` needs NumPy on the bot host (`pip install numpy`).")
+        parts = args.split()
+        weeks = 8
+        if len(parts) > 1 and parts[-1].isdigit():
+            weeks = max(1, min(int(parts.pop()), 52))
+        search = " ".join(parts)
+        if not search: return await ctx.send("❌ Usage: `!trend <name> [weeks]`")
+
+        for c_id, c_name in CLUB_FILENAMES.items():
+            history = await asyncio.to_thread(get_club_history, c_id)
+            i = history.find(search)
+            if i is not None: break
+        else:
+            return await ctx.send(f"❌ No weekly history for **{search}** yet.")
+        m = history.member(i, weeks)
+
+        lines = []
+        for date, gain, rolling in zip(m['dates'], m['gains'], m['rolling']):
+            gain_text = "—" if gain != gain else f"+{int(gain):,}" # NaN: wasn't in the club that week
+            avg_text = "" if rolling != rolling else f" (avg {int(rolling):,})"
+            lines.append(f"`{date}` **{gain_text}**{avg_text}")
+
+        def pct(value): return "—" if value != value else f"{value:+.1f}%"
+        embed = discord.Embed(title=f"📊 Trend: {m['name']}", description="\n".join(lines), color=discord.Color.blue())
+        embed.add_field(name="📈 Week over Week", value=pct(m['week_growth']), inline=True)
+        embed.add_field(name="📅 Monthly Projection", value="—" if m['projected_month'] != m['projected_month'] else f"~{int(m['projected_month']):,}", inline=True)
+        embed.add_field(name="🏅 Club Percentile", value="—" if m['percentile'] != m['percentile'] else f"{m['percentile']:.0f}th", inline=True)
+        embed.add_field(name="💤 Inactive Streak", value=f"{m['inactive_streak']} week(s)", inline=True)
+        embed.set_footer(text=f"Club: {c_name} | {analytics.ROLLING_WEEKS}-week rolling average")
+        await ctx.send(embed=embed)
+
+    # --- 6. ALL CLUBS DASHBOARD (From the cached reads, never scrapes) ---
+    @commands.command(aliases=['overview'])
+    async def dashboard(self, ctx):
+        """ Totals, top gainers and inactive counts across every club """
+        if not club_dashboard.clubs:
+            return await ctx.send("⏳ No club has been read yet, try again in a minute.")
+
+        embed = self.cached_embed('dashboard', None, club_dashboard.version)
+        if embed is None:
+            embed = discord.Embed(title="🌐 All Clubs Dashboard", color=discord.Color.gold())
+            embed.description = (f"✨ **{club_dashboard.total_fans:,}** fans | 🔥 **+{club_dashboard.total_daily:,}** /day\n"
+                                 f"👥 **{club_dashboard.members}** members in {len(club_dashboard.clubs)} clubs | 🔴 **{club_dashboard.inactive}** inactive")
+            club_lines = [
+                f"**{club}**: {share['members']}/30 · {share['fans']:,} · +{share['daily']:,}/day · 🔴 {share['inactive']}"
+                for club, share in sorted(club_dashboard.clubs.items(), key=lambda item: -item[1]['fans'])
+            ]
+            shown = pack_lines(club_lines, 980)[0] # Field limit is 1024 characters
+            hidden = len(club_lines) - shown.count("\n") - 1
+            if hidden: shown += f"\n...and {hidden} more"
+            embed.add_field(name="🏢 Clubs", value=shown, inline=False)
+            top_lines = [f"**{name}** ({club}): +{daily:,}/day" for daily, name, club in club_dashboard.top_daily]
+            embed.add_field(name="🏆 Top Gainers", value="\n".join(top_lines) or "-", inline=False)
+            self.embed_cache[('dashboard', None)] = (club_dashboard.version, embed)
+
+        # Footer changes every minute, so it goes on a copy
+        ages = [snapshot_age(get_port(c_id)) for c_id, name in CLUB_FILENAMES.items() if name in club_dashboard.clubs]
+        missing = len(CLUB_FILENAMES) - len(ages)
+        embed = embed.copy()
+        embed.set_footer(text=f"Oldest data: {format_age(max((a for a in ages if a is not None), default=None))}"
+                              + (f" | {missing} club(s) not read yet" if missing else ""))
         await ctx.send(embed=embed)
 
 async def setup(bot):
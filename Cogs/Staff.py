@@ -1,47 +1,167 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import os
-from datetime import datetime
+import re
+import time
+import asyncio
+import tempfile
+import aiohttp
+from datetime import datetime, timedelta
 from utils import (
-    is_manager, load_json, save_json, save_weekly_csv, 
-    read_browser_and_sort, get_filenames, resolve_club_id,
-    CLUB_FILENAMES, perform_background_refresh 
+    is_manager, load_json, save_json, weekly_rollover, 
+    get_snapshot, get_filenames, resolve_club_id, get_port, for_each_club,
+    CLUBS, CLUB_FILENAMES, refresh_club, change_listeners,
+    SCHEDULE_FILE, WEEKLY_REPORT_SPEC, REFRESH_SETTINGS, driver_stats, get_club_history,
+    get_activity, activity_to_save, start_warm_up, iter_weekly_history, import_weekly_history,
+    stale_note, port_health
 )
+from timeseries import record_snapshot
+from scheduler import Cron, refresh_interval
+from leaderboard import login_state
+from activity import format_since
+from exports import write_csv_gz, write_parquet, read_history_csv, PARQUET_AVAILABLE, DEFAULT_UPLOAD_LIMIT
+from metrics import timed, summary as metrics_summary
+import analytics
+from output import send, reply, send_pages, page_embeds, pack_lines, MESSAGE_LIMIT
 
 # Safety check for ID
 channel_id_env = os.getenv('REPORT_CHANNEL_ID')
 REPORT_CHANNEL_ID = int(channel_id_env) if channel_id_env else 0
+REPORT_RETRY_MINUTES = 10 # Wait before retrying a weekly report that couldn't read the club
+LOGIN_ICONS = {"online": "🟢", "away": "🟡", "inactive": "🔴"}
+DATE_ARG = re.compile(r"^\d{4}-\d{2}(-\d{2})?$") # 2026-10 or 2026-10-18
+DOWNLOAD_CHUNK = 64 * 1024
 
 class Staff(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        print("🕒 Staff Module Loaded. Starting Timers...") # <--- DEBUG PRINT
-        
-        # 1. Start the Weekly Sunday Report Timer
-        self.scheduled_weekly_report.start()
-        
-        # 2. Start the 5-Minute Refresh Timer
-        self.background_browser_refresher.start() 
-        print("✅ Auto-Refresher Started!") # <--- DEBUG PRINT
-
-    # --- 🔄 AUTO REFRESHER (Check every 1 hour) ---
-    @tasks.loop(hours=1) 
-    async def background_browser_refresher(self):
-        print("⏱️ Timer Tick: Refreshing Browsers now...") # <--- DEBUG PRINT
-        
-        # Loop through all configured clubs
-        for c_id in CLUB_FILENAMES.keys():
-            port = 9222 if c_id == 1 else 9223
-            try:
-                # Call the function from utils.py
-                perform_background_refresh(port)
-            except Exception as e:
-                print(f"❌ Error refreshing Port {port}: {e}")
+        print("🕒 Staff Module Loaded. Starting Scheduler...") # <--- DEBUG PRINT
+
+        self.report_crons = {c_id: Cron(c.get('weekly_report', WEEKLY_REPORT_SPEC)) for c_id, c in CLUBS.items()}
+        self.schedule_state = {} # "report:<club>" -> ISO time of the last automatic report (loaded once ready)
+        self.last_refresh = {}  # c_id -> datetime of the last reload (missing = reload now)
+        self.report_retry = {}  # c_id -> datetime before which a failed report isn't retried
+        self.last_command = None
+        self.wake = asyncio.Event()
+        self.scheduler_task = None
+
+    async def cog_load(self):
+        self.scheduler_task = asyncio.create_task(self.run_scheduler())
+        change_listeners.append(self.on_leaderboard_change)
+        print("✅ Scheduler Started!") # <--- DEBUG PRINT
+
+    async def cog_unload(self):
+        if self.scheduler_task: self.scheduler_task.cancel()
+        if self.on_leaderboard_change in change_listeners: change_listeners.remove(self.on_leaderboard_change)
+
+    @commands.Cog.listener()
+    async def on_command(self, ctx):
+        # Commands make the refresher speed up, so wake it to recompute its deadlines
+        self.last_command = datetime.now()
+        self.wake.set()
 
-    @background_browser_refresher.before_loop
-    async def before_refresh(self):
+    # --- 🔄 SCHEDULER (Sleeps until the next reload or report is due) ---
+    def report_due(self, c_id):
+        last_run = datetime.fromisoformat(self.schedule_state[f"report:{CLUB_FILENAMES[c_id]}"])
+        due = self.report_crons[c_id].next_after(last_run)
+        retry = self.report_retry.get(c_id)
+        return max(due, retry) if retry else due
+
+    def refresh_due(self, c_id, now):
+        last = self.last_refresh.get(c_id)
+        if last is None: return now
+        next_report = self.report_crons[c_id].next_after(now)
+        return last + timedelta(seconds=refresh_interval(REFRESH_SETTINGS, now, self.last_command, next_report))
+
+    async def run_scheduler(self):
         print("⏳ Waiting for bot to be ready before refreshing...")
         await self.bot.wait_until_ready()
+        # Let the first reads finish before reloading any page (shield: unloading the cog mustn't stop it)
+        await asyncio.shield(start_warm_up())
+        self.schedule_state = await asyncio.to_thread(load_json, SCHEDULE_FILE)
+
+        # First start for a club: nothing to catch up on, count from now.
+        # Otherwise a report missed while the bot was down is due right away.
+        new_clubs = [n for n in CLUB_FILENAMES.values() if f"report:{n}" not in self.schedule_state]
+        for name in new_clubs:
+            self.schedule_state[f"report:{name}"] = datetime.now().isoformat()
+        if new_clubs: save_json(SCHEDULE_FILE, self.schedule_state)
+
+        while not self.bot.is_closed():
+            try:
+                await self.run_due_jobs()
+            except Exception as e:
+                print(f"❌ Scheduler Error: {e}")
+                await asyncio.sleep(60)
+
+    async def run_due_jobs(self):
+        now = datetime.now()
+        reports = [c_id for c_id in CLUBS if self.report_due(c_id) <= now]
+        refreshes = [c_id for c_id in CLUBS if self.refresh_due(c_id, now) <= now]
+
+        if reports:
+            print("🤖 Running Auto Report...")
+            await self.run_auto_reports(reports)
+        if refreshes:
+            print("⏱️ Timer Tick: Refreshing Browsers now...") # <--- DEBUG PRINT
+            async def staggered(index, c_id):
+                # Don't reload every Chrome at the exact same moment. The wait holds nothing:
+                # the scrape pool and per-port limits bound the reloads themselves.
+                await asyncio.sleep(index * REFRESH_SETTINGS['stagger_seconds'])
+                await self.refresh_one_club(c_id)
+            await asyncio.gather(*(staggered(i, c_id) for i, c_id in enumerate(refreshes)))
+        if reports or refreshes: return
+
+        next_due = min([self.report_due(c_id) for c_id in CLUBS] + [self.refresh_due(c_id, now) for c_id in CLUBS])
+        # Sleep until then (at most 1h, in case the clock jumps), or until a command wakes us
+        self.wake.clear()
+        try:
+            await asyncio.wait_for(self.wake.wait(), timeout=min((next_due - now).total_seconds(), 3600))
+        except asyncio.TimeoutError:
+            pass
+
+    async def refresh_one_club(self, c_id):
+        port = get_port(c_id)
+        try:
+            # Runs in the scraper pool so commands keep working meanwhile
+            await refresh_club(port)
+            # Re-fill the cache once so commands serve the freshly loaded page
+            club_title_from_web, raw_data = await get_snapshot(port, max_age=0, allow_stale=False)
+            # Keep one hourly sample per member for !history
+            if club_title_from_web:
+                with timed("history.record"):
+                    await asyncio.to_thread(record_snapshot, CLUB_FILENAMES[c_id], raw_data)
+            # Keep last-seen times across restarts, so !inactive works before the first scrape
+            pending = activity_to_save(c_id)
+            if pending: await asyncio.to_thread(save_json, *pending)
+        except Exception as e:
+            print(f"❌ Error refreshing Port {port}: {e}")
+        finally:
+            self.last_refresh[c_id] = datetime.now()
+
+    # --- 📣 RANK ALERTS (Clubs with "rank_alerts": true in clubs.json) ---
+    def on_leaderboard_change(self, port, events):
+        for c_id in CLUBS:
+            if get_port(c_id) == port and CLUBS[c_id].get('rank_alerts'):
+                asyncio.create_task(self.post_rank_changes(c_id, events))
+
+    async def post_rank_changes(self, c_id, events):
+        channel = self.bot.get_channel(CLUBS[c_id].get('channel') or REPORT_CHANNEL_ID)
+        if channel is None: return
+        lines = []
+        for e in events:
+            if e['type'] == 'rank':
+                if e.get('displaced'): continue # The overtake, join or leave that caused it is posted already
+                icon = "📈" if e['new'] < e['old'] else "📉"
+                lines.append(f"{icon} **{e['name']}** #{e['old']} → #{e['new']}")
+            elif e['type'] == 'join':
+                lines.append(f"👋 **{e['name']}** joined at #{e['new']}")
+            elif e['type'] == 'leave':
+                lines.append(f"🚪 **{e['name']}** left (was #{e['old']})")
+        if not lines: return
+        header = f"📣 **{CLUB_FILENAMES[c_id]} Ranking Changes**"
+        for chunk in pack_lines([header] + lines, MESSAGE_LIMIT):
+            await send(channel, chunk, allowed_mentions=discord.AllowedMentions.none())
 
     # --- 1. MEMBER STATUS ---
     @commands.command()
@@ -51,26 +171,22 @@ class Staff(commands.Cog):
         if not club_id: return await ctx.send(f"❌ Unknown Club: {club_ref}")
 
         club_name = CLUB_FILENAMES.get(club_id, f"Club {club_id}")
-        port = 9222 if club_id == 1 else 9223
+        port = get_port(club_id)
         
-        await ctx.send(f"🕒 Checking **{club_name}** login status...")
+        loading_msg = await ctx.send(f"🕒 Checking **{club_name}** login status...")
         
-        club_title_from_web, raw_data = read_browser_and_sort(port)
-        if not club_title_from_web: return await ctx.send(f"❌ {raw_data}")
+        club_title_from_web, raw_data = await get_snapshot(port)
+        if not club_title_from_web: return await reply(ctx, loading_msg, content=f"❌ {raw_data}")
 
-        msg = f"🕒 **Last Login: {club_name}** 🕒\n"
+        lines = []
         for i, p in enumerate(raw_data):
             login = p['login']
-            if "minute" in login or "hour" in login: icon = "🟢"
-            elif "1 day" in login: icon = "🟡"
-            else: icon = "🔴"
-            
-            line = f"{i+1}. **{p['name']}**: {login} {icon}\n"
-            if len(msg) + len(line) > 1900:
-                await ctx.send(msg)
-                msg = ""
-            msg += line
-        if msg: await ctx.send(msg)
+            icon = LOGIN_ICONS[login_state(login)]
+            lines.append(f"{i+1}. **{p['name']}**: {login} {icon}")
+
+        # One message: long clubs get ◀ ▶ pages instead of a burst of messages
+        pages = page_embeds(f"🕒 Last Login: {club_name}", lines, discord.Color.blue(), footer=stale_note(port))
+        await send_pages(ctx, pages, loading_msg, author_id=ctx.author.id)
 
     # --- 2. LINK ---
     @commands.command()
@@ -109,40 +225,218 @@ class Staff(commands.Cog):
     @commands.command()
     @commands.check(is_manager)
     async def weekly(self, ctx):
-        await ctx.send("📅 **Saving Weekly Reports for ALL Clubs...**")
-        for c_id, c_name in CLUB_FILENAMES.items():
-            port = 9222 if c_id == 1 else 9223
-            await self.run_report_for_club(ctx, c_id, port, c_name)
-        await ctx.send("✅ **All Clubs Saved!**")
-
-    # --- 5. AUTOMATIC WEEKLY LOOP ---
-    @tasks.loop(minutes=1)
-    async def scheduled_weekly_report(self):
-        now = datetime.now()
-        if now.weekday() == 6 and now.hour == 20 and now.minute == 0:
-            if REPORT_CHANNEL_ID == 0: return
-            channel = self.bot.get_channel(REPORT_CHANNEL_ID)
-            if channel:
-                print("🤖 Running Auto Report...")
-                for c_id, c_name in CLUB_FILENAMES.items():
-                    port = 9222 if c_id == 1 else 9223
-                    await self.run_report_for_club(channel, c_id, port, c_name)
-
-    async def run_report_for_club(self, ctx_or_channel, club_num, port, pretty_name):
-        club_title_from_web, current_data = read_browser_and_sort(port)
-        if not club_title_from_web:
-            await ctx_or_channel.send(f"❌ Error: Could not read **{pretty_name}** (Port {port})")
-            return
-        files = get_filenames(club_num)
-        last_week = load_json(files['json'])
-        save_weekly_csv(files['csv'], current_data, last_week)
-        new_snapshot = {p['name']: p['fans'] for p in current_data}
-        save_json(files['json'], new_snapshot)
-        await ctx_or_channel.send(f"✅ **{pretty_name}** Data Saved!")
-
-    @scheduled_weekly_report.before_loop
-    async def before_task(self):
-        await self.bot.wait_until_ready()
+        loading_msg = await ctx.send("📅 **Saving Weekly Reports for ALL Clubs...**")
+        results = await self.run_weekly_save(list(CLUBS))
+        # One summary instead of a message per club
+        lines = [line for ok, line in results.values()]
+        title = "✅ All Clubs Saved!" if all(ok for ok, line in results.values()) else "⚠️ Weekly Save Finished With Errors"
+        await send_pages(ctx, page_embeds(title, lines, discord.Color.green()), loading_msg, author_id=ctx.author.id)
+
+    # --- 5. AUTOMATIC WEEKLY REPORT (Run by the scheduler) ---
+    async def run_auto_reports(self, club_ids):
+        # Club's own channel from clubs.json, otherwise the shared REPORT_CHANNEL_ID
+        channels = {c_id: self.bot.get_channel(CLUBS[c_id].get('channel') or REPORT_CHANNEL_ID) for c_id in club_ids}
+        for c_id, channel in channels.items():
+            if channel is None: print(f"⚠️ No report channel for {CLUB_FILENAMES[c_id]}, skipping this week.")
+        to_save = [c_id for c_id in club_ids if channels[c_id] is not None]
+        results = await self.run_weekly_save(to_save) if to_save else {}
+
+        by_channel = {} # One message per channel, however many clubs report there
+        for c_id in club_ids:
+            ok, line = results.get(c_id, (True, None))
+            if ok:
+                self.report_retry.pop(c_id, None)
+                self.schedule_state[f"report:{CLUB_FILENAMES[c_id]}"] = datetime.now().isoformat()
+            else:
+                self.report_retry[c_id] = datetime.now() + timedelta(minutes=REPORT_RETRY_MINUTES)
+            if line: by_channel.setdefault(channels[c_id], []).append(line)
+        save_json(SCHEDULE_FILE, self.schedule_state)
+
+        for channel, lines in by_channel.items():
+            await send_pages(channel, page_embeds("📅 Weekly Save", lines, discord.Color.green()))
+
+    async def run_weekly_save(self, club_ids):
+        """ Reads every club live, then saves all of them in one rollover. Returns c_id -> (ok, result line). """
+        # Weekly save always reads the page live (and refreshes the cache with it)
+        snapshots = await for_each_club(lambda c_id: get_snapshot(get_port(c_id), max_age=0, allow_stale=False), club_ids)
+        ready = {c_id: data for c_id, (title, data) in zip(club_ids, snapshots) if title and data} # No members = nothing to save
+        replaced = await asyncio.to_thread(weekly_rollover, ready) if ready else {}
+
+        results = {}
+        for c_id in club_ids:
+            pretty_name = CLUB_FILENAMES[c_id]
+            if c_id not in ready:
+                results[c_id] = (False, f"❌ Error: Could not read **{pretty_name}** (Port {get_port(c_id)})")
+            elif replaced[c_id]:
+                results[c_id] = (True, f"♻️ **{pretty_name}** Data Saved! (replaced this week's earlier save)")
+            else:
+                results[c_id] = (True, f"✅ **{pretty_name}** Data Saved!")
+        return results
+
+    # --- 6. PERFORMANCE ---
+    @commands.command()
+    @commands.check(is_manager)
+    async def perf(self, ctx):
+        """ p50/p95 of every timed stage since startup """
+        stats = metrics_summary()
+        lines = [f"{'stage':<26}{'n':>6}{'p50':>9}{'p95':>9}"]
+        for stage, t in stats['timers'].items():
+            lines.append(f"{stage[:26]:<26}{t['count']:>6}{t['p50']:>7.0f}ms{t['p95']:>7.0f}ms")
+        table = "\n".join(lines)
+        if len(table) > 3900: table = table[:3900] + "\n..."
+
+        counters = stats['counters']
+        lookups = counters.get('cache_hits', 0) + counters.get('cache_misses', 0)
+        hit_rate = counters.get('cache_hits', 0) / lookups if lookups else 0.0
+        pool = driver_stats()
+
+        embed = discord.Embed(title="⏱️ Performance Since Startup", description=f"```\n{table}\n```", color=discord.Color.blue())
+        embed.add_field(name="🗃️ Cache", value=f"{hit_rate:.0%} hits ({lookups} lookups)", inline=True)
+        embed.add_field(name="🔌 Drivers", value=f"{pool['reuse_rate']:.0%} reused, {pool['avg_connect_ms']:.0f} ms/connect", inline=True)
+        ports = port_health()
+        if ports:
+            embed.add_field(name="🩺 Ports", value=", ".join(f"{port}: {state}" for port, state in ports.items())[:1024], inline=False)
+        if stats['startup']:
+            embed.add_field(name="🚀 Startup", value=", ".join(f"{k}: {v:.0f} ms" for k, v in stats['startup'].items())[:1024], inline=False)
+        embed.add_field(name="🔢 Counters", value=", ".join(f"{k}: {v}" for k, v in counters.items())[:1024] or "-", inline=False)
+        embed.set_footer(text=f"Uptime: {stats['uptime'] / 3600:.1f}h")
+        await ctx.send(embed=embed)
+
+    # --- 7. CLUB ANALYTICS ---
+    @commands.command()
+    @commands.check(is_manager)
+    async def report(self, ctx, club_arg: str = "1"):
+        """ Rolling averages, growth and inactive streaks from the weekly history """
+        if not analytics.AVAILABLE:
+            return await ctx.send("📦 `!report` needs NumPy on the bot host (`pip install numpy`).")
+        club_id = resolve_club_id(club_arg)
+        if not club_id: return await ctx.send("❌ Invalid Club.")
+
+        history = await asyncio.to_thread(get_club_history, club_id)
+        r = history.report()
+        if not r['members']: return await ctx.send(f"❌ No weekly history for **{CLUB_FILENAMES[club_id]}** yet.")
+
+        top_rolling = "\n".join(f"**{name}**: {avg:,.0f}/week" for name, avg in r['top_rolling']) or "-"
+        top_growth = "\n".join(f"**{name}**: {g:+.1f}%" for name, g in r['top_growth']) or "-"
+        inactive = "\n".join(f"**{name}**: {weeks} weeks" for name, weeks in r['inactive'][:15]) or "None 🎉"
+        if len(r['inactive']) > 15: inactive += f"\n...and {len(r['inactive']) - 15} more"
+
+        embed = discord.Embed(title=f"📊 Weekly Analytics: {CLUB_FILENAMES[club_id]}", color=discord.Color.gold())
+        embed.description = (f"Week of **{r['week']}** | {r['members']} members\n"
+                             f"Total gain: **{r['total_gain']:,.0f}** | Median: **{r['median_gain']:,.0f}**\n"
+                             f"Projected month: **~{r['projected_month']:,.0f}**")
+        embed.add_field(name=f"🏆 Best {analytics.ROLLING_WEEKS}-Week Average", value=top_rolling, inline=True)
+        embed.add_field(name="📈 Biggest Growth", value=top_growth, inline=True)
+        embed.add_field(name="💤 Inactive Streaks", value=inactive[:1024], inline=False)
+        await ctx.send(embed=embed)
+
+    # --- 8. INACTIVITY SWEEP (From the last scrape, no live read) ---
+    @commands.command()
+    @commands.check(is_manager)
+    async def inactive(self, ctx, days: float = 3, club_ref: str = "all"):
+        """ Members not seen for more than N days: !inactive [days] [club|all] """
+        club_ids = list(CLUBS) if club_ref.lower() == "all" else [resolve_club_id(club_ref)]
+        if None in club_ids: return await ctx.send(f"❌ Unknown Club: {club_ref}")
+
+        now = time.time()
+        lines = []
+        for c_id in club_ids:
+            found = get_activity(c_id).inactive_for(days * 86400, now)
+            if not found: continue
+            lines.append(f"**{CLUB_FILENAMES[c_id]}** ({len(found)})")
+            lines.extend(f"🔴 **{name}**: {format_since(now - seen)}" for seen, name in found)
+        if not lines: lines = ["Nobody 🎉"]
+
+        title = f"💤 Not Seen For {days:g}+ Days"
+        await send_pages(ctx, page_embeds(title, lines, discord.Color.red(), footer="From the last page read"), author_id=ctx.author.id)
+
+    @commands.command()
+    @commands.check(is_manager)
+    async def seen(self, ctx, *, name: str):
+        """ Last login and login count for one member """
+        now = time.time()
+        for c_id in CLUBS:
+            index = get_activity(c_id)
+            real_name = index.find(name)
+            if real_name is not None: break
+        else:
+            return await ctx.send(f"❌ No login data for **{name}** yet.")
+
+        last = index.last_seen[real_name]
+        embed = discord.Embed(title=f"🕒 Activity: {real_name}", color=discord.Color.blue())
+        embed.add_field(name="👀 Last Seen", value=format_since(now - last), inline=True)
+        embed.add_field(name="📅 Logins (7 days)", value=str(len(index.logins_between(real_name, now - 7 * 86400, now))), inline=True)
+        embed.add_field(name="📅 Logins (30 days)", value=str(len(index.logins_between(real_name, now - 30 * 86400, now))), inline=True)
+        embed.set_footer(text=f"Club: {CLUB_FILENAMES[c_id]} | Logins noticed between page reads")
+        await ctx.send(embed=embed)
+
+    # --- 9. HISTORY EXPORT / IMPORT ---
+    @commands.command()
+    @commands.check(is_manager)
+    async def export(self, ctx, club_ref: str = "main", *args):
+        """ Weekly history as a compressed file: !export <club> [from] [to] [csv|parquet] """
+        usage = "❌ Usage: `!export <club> [from] [to] [csv|parquet]` (dates like `2026-01` or `2026-01-31`)"
+        club_id = resolve_club_id(club_ref)
+        if not club_id: return await ctx.send(f"❌ Unknown Club: {club_ref}")
+        fmt, dates = "csv", []
+        for arg in args:
+            if arg.lower() in ("csv", "parquet"): fmt = arg.lower()
+            elif DATE_ARG.match(arg) and len(dates) < 2: dates.append(arg)
+            else: return await ctx.send(usage)
+        if fmt == "parquet" and not PARQUET_AVAILABLE:
+            return await ctx.send("📦 Parquet export needs pyarrow on the bot host (`pip install pyarrow`). Use `csv` instead.")
+        since = dates[0] if dates else None
+        until = dates[1] if len(dates) > 1 else None
+        if until and len(until) == 7: until += "-31" # A whole month
+
+        club_name = CLUB_FILENAMES[club_id]
+        loading_msg = await ctx.send(f"📦 Exporting **{club_name}** history...")
+        history_file = get_filenames(club_id)['csv']
+        writer = write_csv_gz if fmt == "csv" else write_parquet
+        limit = ctx.guild.filesize_limit if ctx.guild else DEFAULT_UPLOAD_LIMIT
+
+        with tempfile.TemporaryDirectory() as folder:
+            label = "_".join(d for d in (since, until) if d) or "all"
+            path = os.path.join(folder, f"{club_name}_history_{label}" + (".csv.gz" if fmt == "csv" else ".parquet"))
+            with timed("export.write"):
+                rows = await asyncio.to_thread(writer, iter_weekly_history(history_file, since, until), path)
+            if not rows: return await reply(ctx, loading_msg, content=f"❌ No **{club_name}** history in that range.")
+            size = os.path.getsize(path)
+            if size > limit:
+                return await reply(ctx, loading_msg, content=f"❌ The file is {size / 1e6:.1f} MB, over this server's upload limit. Try a shorter range.")
+            await reply(ctx, loading_msg, content=f"📦 **{club_name}**: {rows:,} rows ({size / 1e3:,.0f} KB)",
+                        attachments=[discord.File(path)])
+
+    @commands.command(name="import")
+    @commands.check(is_manager)
+    async def import_history(self, ctx, club_ref: str = "main"):
+        """ Backfills weekly history from an attached spreadsheet CSV (.csv or .csv.gz) """
+        club_id = resolve_club_id(club_ref)
+        if not club_id: return await ctx.send(f"❌ Unknown Club: {club_ref}")
+        attachment = next((a for a in ctx.message.attachments if a.filename.lower().endswith((".csv", ".csv.gz"))), None)
+        if attachment is None:
+            return await ctx.send("❌ Attach a `.csv` or `.csv.gz` with Date, Name and Total Fans columns to `!import <club>`.")
+
+        club_name = CLUB_FILENAMES[club_id]
+        loading_msg = await ctx.send(f"📥 Importing `{attachment.filename}` into **{club_name}**...")
+        with tempfile.TemporaryDirectory() as folder:
+            # Straight to disk in pieces, so a big spreadsheet never sits in memory
+            path = os.path.join(folder, os.path.basename(attachment.filename))
+            async with aiohttp.ClientSession() as session:
+                async with session.get(attachment.url) as response:
+                    response.raise_for_status()
+                    with open(path, 'wb') as f:
+                        async for piece in response.content.iter_chunked(DOWNLOAD_CHUNK):
+                            f.write(piece)
+
+            stats = {'skipped': 0}
+            try:
+                written = await asyncio.to_thread(import_weekly_history, get_filenames(club_id)['csv'], read_history_csv(path, stats))
+            except (ValueError, UnicodeDecodeError, OSError) as e: # OSError: not really gzip
+                return await reply(ctx, loading_msg, content=f"❌ Could not read `{attachment.filename}`: {e}")
+
+        skipped = f" ({stats['skipped']:,} unreadable rows skipped)" if stats['skipped'] else ""
+        await reply(ctx, loading_msg, content=f"📥 Imported **{written:,}** rows into **{club_name}**{skipped}. Dates in the file replaced what was stored for them.")
 
 async def setup(bot):
     await bot.add_cog(Staff(bot))
\ No newline at end of file
@@ -1,8 +1,14 @@
+import time
+boot_started = time.perf_counter() # Startup timing begins before the (slow) discord import
 import discord
 import os
 import asyncio
 from discord.ext import commands
 from dotenv import load_dotenv
+from metrics import timed, observe, count, start_exporters, mark_startup, startup
+from output import wait_turn
+
+mark_startup("imports", (time.perf_counter() - boot_started) * 1000)
 
 # Load Token
 load_dotenv()
@@ -16,9 +22,48 @@ bot = commands.Bot(command_prefix='!', intents=intents, case_insensitive=True)
 # Remove default help to use our custom one
 bot.remove_command('help')
 
+# --- PERFORMANCE TIMING ---
+class TimedContext(commands.Context):
+    """ Same as the normal context, but every message we send is paced against rate limits and timed for !perf. """
+    async def send(self, *args, **kwargs):
+        await wait_turn(self)
+        with timed("discord.send"):
+            return await super().send(*args, **kwargs)
+
+@bot.event
+async def on_message(message):
+    if message.author.bot: return
+    ctx = await bot.get_context(message, cls=TimedContext)
+    await bot.invoke(ctx)
+
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def stop_command_timer(ctx):
+    count("commands")
+    started_at = getattr(ctx, 'started_at', None)
+    if started_at is not None:
+        observe(f"command.{ctx.command.qualified_name}", (time.perf_counter() - started_at) * 1000)
+
+exporters_started = False
+
 @bot.event
 async def on_ready():
+    global exporters_started
     print(f"✅ Main System Logged in as {bot.user}")
+    if not exporters_started:
+        exporters_started = True
+        mark_startup("ready", (time.perf_counter() - boot_started) * 1000)
+        await start_exporters()
+        # Connect to Chrome and fill the caches in the background; commands already work meanwhile
+        from utils import start_warm_up
+        start_warm_up().add_done_callback(print_startup_times)
+
+def print_startup_times(task):
+    mark_startup("warm", (time.perf_counter() - boot_started) * 1000)
+    print("🚀 Startup: " + " | ".join(f"{phase} {ms:.0f}ms" for phase, ms in startup.items()))
 
 # --- CUSTOM HELP COMMAND ---
 @bot.command()
@@ -46,7 +91,21 @@ async def help(ctx):
         "> `!profile [name]`\n"
         "👤 **Personal Stats**\n"
         "Check Rank, Fans, and Weekly Growth for yourself or a friend.\n"
-        "*(Ex: `!profile`, `!profile @Kuro`, `!profile Silence`)*"
+        "*(Ex: `!profile`, `!profile @Kuro`, `!profile Silence`)*\n\n"
+        
+        "> `!history [name] [days]`\n"
+        "📉 **Fan History**\n"
+        "Day-by-day fans from the hourly samples (default 7 days).\n"
+        "*(Ex: `!history Silence`, `!history Silence 30`)*\n\n"
+        
+        "> `!trend [name] [weeks]`\n"
+        "📊 **Weekly Trend**\n"
+        "Weekly gains, 4-week average, growth and monthly projection (default 8 weeks).\n"
+        "*(Ex: `!trend Silence`, `!trend Silence 12`)*\n\n"
+        
+        "> `!dashboard`\n"
+        "🌐 **All Clubs**\n"
+        "Total fans, daily output, top gainers and inactive counts across every club."
     )
     embed.add_field(name="📊 **Public Statistics**", value=public_cmds, inline=False)
     
@@ -69,6 +128,24 @@ async def help(ctx):
             "💾 **Sunday Save**\n"
             "Manually trigger the Weekly CSV Save & Reset for **ALL** clubs."
             "Mods and staff can use this to save manually (Triggered at 20:00 sunday automated).\n\n"
+            
+            "> `!perf`\n"
+            "⏱️ **Performance**\n"
+            "p50/p95 timings of scraping, storage and commands since startup.\n\n"
+            
+            "> `!report [club]`\n"
+            "📊 **Club Analytics**\n"
+            "Top 4-week averages, biggest growth and inactive streaks from the weekly saves.\n\n"
+            
+            "> `!inactive [days] [club]`\n"
+            "💤 **Inactivity Sweep**\n"
+            "Everyone not seen for N days (default 3) in one club or `all`, without reloading pages.\n"
+            "*(Ex: `!inactive 5 all`)* — `!seen <name>` shows one member's last login.\n\n"
+            
+            "> `!export <club> [from] [to] [csv|parquet]`\n"
+            "📦 **Export History**\n"
+            "Weekly history as a compressed file. `!import <club>` with a CSV attached backfills old spreadsheets.\n"
+            "*(Ex: `!export main 2026-01 2026-06`)*\n\n"
         )
         embed.add_field(name="🔒 **Staff / Mod Operations**", value=staff_cmds, inline=False)
     
@@ -79,8 +156,10 @@ async def help(ctx):
 
 async def load_extensions():
     # Load files from the Cogs folder
+    start = time.perf_counter()
     await bot.load_extension("Cogs.Public")
     await bot.load_extension("Cogs.Staff")
+    mark_startup("cogs", (time.perf_counter() - start) * 1000)
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -108,7 +187,12 @@ async def on_command_error(ctx, error):
 async def main():
     async with bot:
         await load_extensions()
-        await bot.start(TOKEN)
+        try:
+            await bot.start(TOKEN)
+        finally:
+            # Stop the pooled chromedriver processes so they don't pile up
+            from utils import shutdown_scraper
+            shutdown_scraper()
 
 if __name__ == '__main__':
     try:
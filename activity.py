@@ -0,0 +1,110 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+
+# --- ⚙️ MEMBER ACTIVITY ⚙️ ---
+# The page only says "3 hours ago". Each scrape turns that into a timestamp, so "who hasn't
+# logged in for N days" can be answered for every club from memory, without reading the pages.
+
+UNIT_SECONDS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400,
+                'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400}
+LOGIN_PATTERN = re.compile(r"(\d+|an?|one)\s*(second|minute|hour|day|week|month|year)s?")
+MAX_LOGINS_KEPT = 200 # Per member
+CLOCK_SLACK = 120     # Seconds of give between scrapes before we call it a new login
+LEFT_AFTER_SCRAPES = 3   # A member missing from this many scrapes in a row...
+LEFT_AFTER_SECONDS = 86400 # ...and for at least this long has left the club (one bad read is not leaving)
+
+
+# --- 1. PARSING ---
+def parse_login(text):
+    """ "3 hours ago" -> (10800, 3600): seconds since the login, and how rough that number is.
+    None if the text can't be read. """
+    text = text.strip().lower()
+    if not text: return None
+    if "just now" in text or text in ("now", "online"): return (0, 60)
+    if "yesterday" in text: return (86400, 86400)
+    match = LOGIN_PATTERN.search(text)
+    if not match: return None
+    amount = int(match.group(1)) if match.group(1).isdigit() else 1
+    unit = UNIT_SECONDS[match.group(2)]
+    return amount * unit, unit
+
+def format_since(seconds):
+    days, rest = divmod(int(seconds), 86400)
+    if days: return f"{days}d {rest // 3600}h ago"
+    if rest >= 3600: return f"{rest // 3600}h ago"
+    return f"{rest // 60}m ago"
+
+
+# --- 2. ONE CLUB ---
+class ActivityIndex:
+    def __init__(self):
+        self.last_seen = {} # name -> timestamp of the latest login we know of
+        self.order = []     # (timestamp, name), sorted: longest inactive first
+        self.logins = {}    # name -> [timestamps of every login we noticed], oldest first
+        self.missing = {}   # name -> [first scrape they were missing from, scrapes missed in a row]
+        self.dirty = False  # Changed since the last save
+
+    def _set(self, name, ts):
+        old = self.last_seen.get(name)
+        if old is not None: self.order.pop(bisect_left(self.order, (old, name)))
+        self.last_seen[name] = ts
+        insort(self.order, (ts, name))
+
+    def _drop(self, name):
+        self.order.pop(bisect_left(self.order, (self.last_seen.pop(name), name)))
+        self.logins.pop(name, None)
+
+    def update(self, data_list, now):
+        """ Applies one scrape taken at `now` (epoch seconds). """
+        members = {p['name'] for p in data_list}
+        for name in members: self.missing.pop(name, None)
+        for name in [n for n in self.last_seen if n not in members]:
+            since, misses = self.missing.get(name, (now, 0))
+            self.missing[name] = [since, misses + 1]
+            if misses + 1 >= LEFT_AFTER_SCRAPES and now - since >= LEFT_AFTER_SECONDS:
+                self._drop(name) # Left the club
+                self.missing.pop(name)
+                self.dirty = True
+        for p in data_list:
+            parsed = parse_login(p['login'])
+            if parsed is None: continue
+            age, precision = parsed
+            seen = now - age # Latest moment the login could have been
+            old = self.last_seen.get(p['name'])
+            # Same login as last time if the old guess still fits inside the new text's range
+            if old is not None and old >= seen - precision - CLOCK_SLACK: continue
+            self._set(p['name'], seen)
+            history = self.logins.setdefault(p['name'], [])
+            history.append(seen)
+            if len(history) > MAX_LOGINS_KEPT: del history[0]
+            self.dirty = True
+
+    def inactive_for(self, seconds, now):
+        """ [(last seen, name)] of everyone not seen for more than `seconds`, longest first. """
+        return self.order[:bisect_left(self.order, (now - seconds,))]
+
+    def find(self, name):
+        """ Member name: exact, then case-insensitive, then partial. None if unknown. """
+        if name in self.last_seen: return name
+        folded = name.casefold()
+        partial = None
+        for n in self.last_seen:
+            if n.casefold() == folded: return n
+            if partial is None and folded in n.casefold(): partial = n
+        return partial
+
+    def logins_between(self, name, since, until):
+        history = self.logins.get(name, [])
+        return history[bisect_left(history, since):bisect_right(history, until)]
+
+    def to_dict(self):
+        return {name: {'seen': ts, 'logins': list(self.logins.get(name, []))} for name, ts in self.last_seen.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        for name, entry in data.items():
+            index.last_seen[name] = entry['seen']
+            index.logins[name] = entry['logins']
+        index.order = sorted((ts, name) for name, ts in index.last_seen.items())
+        return index
@@ -0,0 +1,118 @@
+import importlib.util
+
+# Only !trend / !report need NumPy (pip install numpy). It's imported when the first history is built.
+AVAILABLE = importlib.util.find_spec("numpy") is not None
+np = None
+
+def _import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+# --- ⚙️ WEEKLY HISTORY ANALYTICS ⚙️ ---
+# Turns a club's weekly history (weekly_rollover rows) into members x weeks arrays once,
+# then computes every stat for every member at the same time with NumPy.
+
+ROLLING_WEEKS = 4        # Weeks in the rolling average
+INACTIVE_WEEKLY_GAIN = 0 # A week with this gain or less counts as inactive
+
+class ClubHistory:
+    def __init__(self, rows):
+        """ rows: [date, name, total_fans, weekly_gain, daily_avg] """
+        _import_numpy()
+        self.dates = sorted({r[0] for r in rows})
+        self.names = sorted({r[1] for r in rows})
+        date_index = {d: i for i, d in enumerate(self.dates)}
+        self.name_index = {n: i for i, n in enumerate(self.names)}
+        self.folded_index = {n.casefold(): i for i, n in enumerate(self.names)}
+
+        shape = (len(self.names), len(self.dates))
+        self.fans = np.full(shape, np.nan)
+        self.gains = np.full(shape, np.nan)
+        if rows:
+            row_idx = np.fromiter((self.name_index[r[1]] for r in rows), dtype=np.intp, count=len(rows))
+            col_idx = np.fromiter((date_index[r[0]] for r in rows), dtype=np.intp, count=len(rows))
+            self.fans[row_idx, col_idx] = np.fromiter((r[2] for r in rows), dtype=float, count=len(rows))
+            self.gains[row_idx, col_idx] = np.fromiter((r[3] for r in rows), dtype=float, count=len(rows))
+        self._compute()
+
+    def _compute(self):
+        gains = self.gains
+        members, weeks = gains.shape
+        has_value = ~np.isnan(gains)
+
+        # Rolling average of weekly gains (ignores weeks where the member wasn't there)
+        zero_pad = np.zeros((members, 1))
+        running_sum = np.hstack([zero_pad, np.cumsum(np.where(has_value, gains, 0), axis=1)])
+        running_count = np.hstack([zero_pad, np.cumsum(has_value, axis=1)])
+        start = np.maximum(np.arange(1, weeks + 1) - ROLLING_WEEKS, 0)
+        window_sum = running_sum[:, 1:] - running_sum[:, start]
+        window_count = running_count[:, 1:] - running_count[:, start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.rolling = np.where(window_count > 0, window_sum / window_count, np.nan)
+
+        last = gains[:, -1] if weeks else np.full(members, np.nan)
+        previous = gains[:, -2] if weeks > 1 else np.full(members, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.week_growth = np.where(previous > 0, (last - previous) / previous * 100, np.nan)
+        self.last_gain = last
+        self.projected_month = self.rolling[:, -1] * 30 / 7 if weeks else np.full(members, np.nan)
+
+        # Percentile of last week's gain among the members who have one
+        self.percentile = np.full(members, np.nan)
+        present = ~np.isnan(last)
+        if present.sum() > 1:
+            order = np.argsort(np.argsort(last[present]))
+            self.percentile[present] = order / (present.sum() - 1) * 100
+        elif present.sum() == 1:
+            self.percentile[present] = 100.0
+
+        # Weeks in a row (up to the latest) with no real gain
+        inactive = has_value & (gains <= INACTIVE_WEEKLY_GAIN)
+        self.inactive_streak = np.cumprod(inactive[:, ::-1], axis=1).sum(axis=1)
+        self.current = present
+
+    def find(self, name):
+        """ Row index for a member: exact name, then case-insensitive, then partial. None if unknown. """
+        if name in self.name_index: return self.name_index[name]
+        folded = name.casefold()
+        if folded in self.folded_index: return self.folded_index[folded]
+        for n, i in self.folded_index.items():
+            if folded in n: return i
+        return None
+
+    def member(self, i, weeks):
+        """ One member's stats plus their last `weeks` weekly gains / rolling averages. """
+        recent = slice(max(len(self.dates) - weeks, 0), None)
+        return {
+            'name': self.names[i],
+            'dates': self.dates[recent],
+            'gains': self.gains[i, recent].tolist(),
+            'rolling': self.rolling[i, recent].tolist(),
+            'week_growth': float(self.week_growth[i]),
+            'projected_month': float(self.projected_month[i]),
+            'percentile': float(self.percentile[i]),
+            'inactive_streak': int(self.inactive_streak[i]),
+        }
+
+    def report(self, top=5, min_streak=2):
+        """ Club-wide summary over the members in the latest week. """
+        idx = np.flatnonzero(self.current)
+        rolling_now = self.rolling[idx, -1] if len(self.dates) else np.array([])
+        by_rolling = idx[np.argsort(-np.nan_to_num(rolling_now, nan=-np.inf))][:top]
+        growth = self.week_growth[idx]
+        by_growth = idx[np.argsort(-np.nan_to_num(growth, nan=-np.inf))][:top]
+        streaks = idx[self.inactive_streak[idx] >= min_streak]
+        streaks = streaks[np.argsort(-self.inactive_streak[streaks])]
+        return {
+            'week': self.dates[-1] if self.dates else None,
+            'members': len(idx),
+            'total_gain': float(np.nansum(self.last_gain[idx])),
+            'median_gain': float(np.nanmedian(self.last_gain[idx])) if len(idx) else 0.0,
+            'projected_month': float(np.nansum(self.projected_month[idx])),
+            'top_rolling': [(self.names[i], float(self.rolling[i, -1])) for i in by_rolling],
+            'top_growth': [(self.names[i], float(self.week_growth[i])) for i in by_growth
+                           if not np.isnan(self.week_growth[i])],
+            'inactive': [(self.names[i], int(self.inactive_streak[i])) for i in streaks],
+        }
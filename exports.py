@@ -0,0 +1,82 @@
+import csv
+import gzip
+import importlib.util
+from datetime import date
+from storage import HISTORY_HEADER, HISTORY_CHUNK_ROWS
+
+# --- ⚙️ HISTORY FILES (!export / !import) ⚙️ ---
+# Rows stream through in chunks (storage.HISTORY_CHUNK_ROWS), so a club's whole history is
+# never in memory at once, however long it gets.
+
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None # pip install pyarrow
+DEFAULT_UPLOAD_LIMIT = 10 * 1024 * 1024 # Bytes, for DMs (servers report their own limit)
+
+# Spreadsheet header -> column in a history row (anything else is ignored)
+HEADER_COLUMNS = {
+    "date": 0, "name": 1, "total fans": 2, "fans": 2,
+    "weekly gain": 3, "gain": 3, "daily avg": 4, "daily": 4
+}
+
+
+# --- 1. EXPORT ---
+def write_csv_gz(chunks, path):
+    """ Writes chunks of history rows to a gzip CSV. Returns the row count. """
+    rows = 0
+    with gzip.open(path, 'wt', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HISTORY_HEADER)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+def write_parquet(chunks, path):
+    """ Same as write_csv_gz, as a zstd Parquet file (one row group per chunk). """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([("date", pa.string()), ("name", pa.string()), ("total_fans", pa.int64()),
+                        ("weekly_gain", pa.int64()), ("daily_avg", pa.int64())])
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            columns = [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+# --- 2. IMPORT ---
+def _parse_row(r, position):
+    day = date.fromisoformat(r[position[0]].strip()).isoformat()
+    name = r[position[1]].strip()
+    if not name: raise ValueError("empty name")
+    number = lambda column: int(r[position[column]].replace(",", "").strip())
+    gain = number(3) if 3 in position else 0
+    daily = number(4) if 4 in position else int(gain/7)
+    return [day, name, number(2), gain, daily]
+
+def read_history_csv(path, stats, chunk_rows=HISTORY_CHUNK_ROWS):
+    """ Chunks of rows from a spreadsheet CSV (.csv or .csv.gz) with at least Date, Name and Total Fans
+    columns, in any order. Bad rows are skipped and counted in stats['skipped']. """
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, 'rt', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        position = {}
+        for i, h in enumerate(header):
+            if h in HEADER_COLUMNS: position.setdefault(HEADER_COLUMNS[h], i)
+        if not {0, 1, 2} <= position.keys():
+            raise ValueError("the file needs Date, Name and Total Fans columns")
+
+        chunk = []
+        for r in reader:
+            if not any(r): continue # Blank line
+            try:
+                chunk.append(_parse_row(r, position))
+            except (ValueError, IndexError):
+                stats['skipped'] += 1
+                continue
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk: yield chunk
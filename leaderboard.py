@@ -0,0 +1,148 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from activity import parse_login
+
+# --- ⚙️ MAINTAINED LEADERBOARD ⚙️ ---
+# Keeps one club's ranking between scrapes and turns each new scrape into a list of change events.
+# Only the members that changed are moved, so an update costs O(changes), not a full re-sort.
+
+
+# --- 1. LOGIN STATE (Same buckets as !memberStatus) ---
+def login_state(login):
+    parsed = parse_login(login)
+    if parsed is None: return "inactive"
+    age, precision = parsed
+    if age < 86400: return "online"       # 🟢 Today
+    if age < 2 * 86400: return "away"     # 🟡 1 day ago
+    return "inactive"                     # 🔴
+
+
+# --- 2. ONE CLUB ---
+class Leaderboard:
+    def __init__(self):
+        self.by_name = {}   # name -> member dict from the scraper
+        self.order = []     # (-fans, name), sorted -> position + 1 = rank
+        self.total_fans = 0
+        self.total_daily = 0
+        self.login_counts = Counter() # "online" / "away" / "inactive" -> members
+        self.version = 0    # Goes up every time something changed
+
+    def _key(self, p):
+        return (-p['fans'], p['name'])
+
+    def rank(self, name):
+        return bisect_left(self.order, self._key(self.by_name[name])) + 1
+
+    def members(self):
+        """ Members in rank order. """
+        return [self.by_name[name] for _, name in self.order]
+
+    def apply(self, data_list):
+        """ Updates the state to this scrape. Returns change events (empty on the very first scrape):
+        {'type': 'join'|'leave'|'fans'|'rank'|'login', 'name': ..., 'old': ..., 'new': ...}
+        Members pushed up or down by someone else's move, join or leave get a 'rank' event
+        with 'displaced': True. """
+        first_load = not self.by_name
+        incoming = {p['name']: p for p in data_list}
+        events = []
+
+        left = [name for name in self.by_name if name not in incoming]
+        joined = [name for name in incoming if name not in self.by_name]
+        changed = [name for name, p in incoming.items()
+                   if name in self.by_name and self.by_name[name] != p]
+        moved = [name for name in changed if incoming[name]['fans'] != self.by_name[name]['fans']]
+        joined_set, moved_set = set(joined), set(moved)
+
+        old_ranks = {name: self.rank(name) for name in left + moved}
+
+        # Everyone else whose rank can change sits between a mover's old and new place,
+        # or anywhere below a join or leave. Only those ranges are looked at.
+        spans = [sorted((self._key(self.by_name[name]), self._key(incoming[name]))) for name in moved]
+        below = [self._key(self.by_name[name]) for name in left] + [self._key(incoming[name]) for name in joined]
+        if below: spans.append((min(below), None))
+        displaced = {}
+        for lo, hi in spans:
+            end = len(self.order) if hi is None else bisect_right(self.order, hi)
+            for i in range(bisect_left(self.order, lo), end):
+                name = self.order[i][1]
+                if name not in moved_set and name in incoming: displaced[name] = i + 1
+
+        # Take out everyone who left or whose fans moved, then put the new values back in
+        for name in left + moved:
+            p = self.by_name[name]
+            self.order.pop(bisect_left(self.order, self._key(p)))
+            self.total_fans -= p['fans']
+            self.total_daily -= p['daily']
+        for name in changed:
+            p = self.by_name[name]
+            if name not in moved_set: self.total_daily -= p['daily']
+            self.login_counts[login_state(p['login'])] -= 1
+        for name in left:
+            self.login_counts[login_state(self.by_name[name]['login'])] -= 1
+            del self.by_name[name]
+            events.append({'type': 'leave', 'name': name, 'old': old_ranks[name], 'new': None})
+
+        for name in joined + changed:
+            old, p = self.by_name.get(name), incoming[name]
+            self.by_name[name] = p
+            if name in joined_set or name in moved_set:
+                insort(self.order, self._key(p))
+                self.total_fans += p['fans']
+            self.total_daily += p['daily']
+            self.login_counts[login_state(p['login'])] += 1
+            if old and old['fans'] != p['fans']:
+                events.append({'type': 'fans', 'name': name, 'old': old['fans'], 'new': p['fans']})
+            if old and login_state(old['login']) != login_state(p['login']):
+                events.append({'type': 'login', 'name': name,
+                               'old': login_state(old['login']), 'new': login_state(p['login'])})
+
+        for name in joined:
+            events.append({'type': 'join', 'name': name, 'old': None, 'new': self.rank(name)})
+        for name in moved:
+            new_rank = self.rank(name)
+            if new_rank != old_ranks[name]:
+                events.append({'type': 'rank', 'name': name, 'old': old_ranks[name], 'new': new_rank})
+        for name, old_rank in displaced.items():
+            new_rank = self.rank(name)
+            if new_rank != old_rank:
+                events.append({'type': 'rank', 'name': name, 'old': old_rank, 'new': new_rank, 'displaced': True})
+
+        if left or joined or changed: self.version += 1
+        return [] if first_load else events
+
+
+# --- 3. ALL CLUBS (!dashboard) ---
+TOP_GAINERS = 5
+
+class Dashboard:
+    """ Totals across every club. A scrape replaces only its own club's share, so reading it is O(1). """
+    def __init__(self):
+        self.clubs = {}  # club name -> that club's share (see update)
+        self.total_fans = 0
+        self.total_daily = 0
+        self.members = 0
+        self.inactive = 0
+        self.top_daily = [] # [(daily, member, club)], best first
+        self.version = 0
+
+    def update(self, club, board):
+        old = self.clubs.get(club)
+        if old and old['version'] == board.version: return # Nothing changed in that club
+        share = {
+            'version': board.version, 'fans': board.total_fans, 'daily': board.total_daily,
+            'members': len(board.by_name), 'inactive': board.login_counts['inactive'],
+            'top': heapq.nlargest(TOP_GAINERS, ((p['daily'], p['name']) for p in board.by_name.values()))
+        }
+        if old:
+            self.total_fans -= old['fans']
+            self.total_daily -= old['daily']
+            self.members -= old['members']
+            self.inactive -= old['inactive']
+        self.total_fans += share['fans']
+        self.total_daily += share['daily']
+        self.members += share['members']
+        self.inactive += share['inactive']
+        self.clubs[club] = share
+        self.top_daily = heapq.nlargest(TOP_GAINERS, ((daily, name, c) for c, s in self.clubs.items() for daily, name in s['top']))
+        self.version += 1
@@ -0,0 +1,137 @@
+import os
+import time
+import asyncio
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# --- ⚙️ PERFORMANCE METRICS ⚙️ ---
+# Timers (histograms) per stage and simple counters, kept in memory since startup.
+# Shown by !perf, and exported in Prometheus text format:
+#   METRICS_PORT=9100 -> http://127.0.0.1:9100/metrics
+#   METRICS_FILE=Data/metrics.prom -> rewritten every METRICS_FILE_SECONDS
+
+BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+RECENT_SAMPLES = 2048 # Per stage, used for p50/p95
+
+_lock = threading.Lock()
+_timers = {}   # stage -> Timer
+_counters = {} # name -> int
+startup = {}   # phase -> ms, filled in once while the bot starts
+started_at = time.time()
+
+
+# --- 1. TIMERS & COUNTERS ---
+class Timer:
+    __slots__ = ('buckets', 'count', 'total_ms', 'recent')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1) # Last one = bigger than every bucket
+        self.count = 0
+        self.total_ms = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, ms):
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.recent.append(ms)
+
+    def percentile(self, q):
+        if not self.recent: return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+def observe(stage, ms):
+    with _lock:
+        timer = _timers.get(stage)
+        if timer is None: timer = _timers[stage] = Timer()
+        timer.observe(ms)
+
+def count(name, amount=1):
+    with _lock: _counters[name] = _counters.get(name, 0) + amount
+
+@contextmanager
+def timed(stage):
+    """ with timed("scrape.read"): ...  (works in threads and in async code) """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, (time.perf_counter() - start) * 1000)
+
+def mark_startup(phase, ms):
+    startup[phase] = ms
+    observe(f"startup.{phase}", ms)
+
+def summary():
+    """ {'timers': {stage: {count, p50, p95, avg}}, 'counters': {...}, 'startup': {...}} for !perf. """
+    with _lock:
+        timers = {
+            stage: {'count': t.count, 'p50': t.percentile(0.5), 'p95': t.percentile(0.95),
+                    'avg': t.total_ms / t.count if t.count else 0.0}
+            for stage, t in sorted(_timers.items())
+        }
+        return {'timers': timers, 'counters': dict(sorted(_counters.items())), 'startup': dict(startup),
+                'uptime': time.time() - started_at}
+
+
+# --- 2. PROMETHEUS EXPORT ---
+def _metric_name(text):
+    return "".join(ch if ch.isalnum() else "_" for ch in text)
+
+def prometheus_text():
+    lines = []
+    with _lock:
+        lines.append("# TYPE almond_stage_ms histogram")
+        for stage, t in sorted(_timers.items()):
+            label = f'stage="{stage}"'
+            running = 0
+            for bound, n in zip(BUCKETS_MS, t.buckets):
+                running += n
+                lines.append(f'almond_stage_ms_bucket{{{label},le="{bound}"}} {running}')
+            lines.append(f'almond_stage_ms_bucket{{{label},le="+Inf"}} {t.count}')
+            lines.append(f'almond_stage_ms_sum{{{label}}} {t.total_ms:.3f}')
+            lines.append(f'almond_stage_ms_count{{{label}}} {t.count}')
+        for name, value in sorted(_counters.items()):
+            metric = f"almond_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+    lines.append(f"almond_uptime_seconds {time.time() - started_at:.0f}")
+    return "\n".join(lines) + "\n"
+
+async def _handle_http(reader, writer):
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = prometheus_text().encode('utf-8')
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                     + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def start_exporters():
+    """ Starts whatever METRICS_PORT / METRICS_FILE ask for. Call once the event loop is running. """
+    port = int(os.getenv('METRICS_PORT', 0))
+    if port:
+        await asyncio.start_server(_handle_http, "127.0.0.1", port)
+        print(f"📈 Metrics on http://127.0.0.1:{port}/metrics")
+    path = os.getenv('METRICS_FILE')
+    if path:
+        asyncio.create_task(_write_file_forever(path, int(os.getenv('METRICS_FILE_SECONDS', 60))))
+        print(f"📈 Metrics written to {path}")
+
+async def _write_file_forever(path, every):
+    while True:
+        tmp = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True) # Data/ may not exist yet on a fresh install
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(prometheus_text())
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {path}: {e}") # Try again next time
+        await asyncio.sleep(every)
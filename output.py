@@ -0,0 +1,164 @@
+import time
+import asyncio
+from collections import deque
+import discord
+from discord.ext import commands
+from metrics import count, observe
+
+# --- ⚙️ DISCORD OUTPUT ⚙️ ---
+# Packs long output into as few messages as possible (pages with buttons, up to 10 embeds per
+# message), edits "Loading..." messages in place, and paces every send/edit against Discord's
+# rate limits so a big report queues up evenly instead of bouncing off 429s.
+
+CHANNEL_RATE = (5, 5.0)  # Messages per channel: 5 every 5 seconds
+GLOBAL_RATE = (50, 1.0)  # Requests for the whole bot: 50 per second
+MESSAGE_LIMIT = 2000
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TOTAL_LIMIT = 6000
+EMBEDS_PER_MESSAGE = 10
+PAGE_TIMEOUT = 300       # Seconds before page buttons stop working
+
+
+# --- 1. RATE LIMIT PACING ---
+class RateBucket:
+    """ At most `limit` requests every `per` seconds. Waiters go through in the order they arrived. """
+    def __init__(self, limit, per):
+        self.limit = limit
+        self.per = per
+        self.sent = deque()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            now = time.monotonic()
+            while self.sent and self.sent[0] <= now - self.per:
+                self.sent.popleft()
+            if len(self.sent) >= self.limit:
+                wait = self.sent[0] + self.per - now
+                count("discord.rate_waits")
+                observe("discord.rate_wait", wait * 1000)
+                await asyncio.sleep(wait)
+                self.sent.popleft()
+            self.sent.append(time.monotonic())
+
+_channel_buckets = {} # channel id -> RateBucket
+_global_bucket = RateBucket(*GLOBAL_RATE)
+
+def _channel_id(target):
+    """ Channel id of a Context, Message or channel (None for anything else). """
+    return getattr(getattr(target, 'channel', target), 'id', None)
+
+async def wait_turn(target):
+    """ Waits until one more message can go to this target's channel without hitting a rate limit. """
+    key = _channel_id(target)
+    if key is None: return # Not a Discord channel (benchmark stubs)
+    bucket = _channel_buckets.get(key)
+    if bucket is None: bucket = _channel_buckets[key] = RateBucket(*CHANNEL_RATE)
+    await bucket.acquire()
+    await _global_bucket.acquire()
+
+async def send(target, *args, **kwargs):
+    """ target.send, paced. A command Context is already paced by Main's TimedContext. """
+    if not isinstance(target, commands.Context): await wait_turn(target)
+    return await target.send(*args, **kwargs)
+
+async def reply(ctx, loading=None, **kwargs):
+    """ Turns the loading message into the answer with one edit, or sends a new message. """
+    if loading is not None:
+        kwargs.setdefault('content', None) # Clear the "Loading..." text
+        try:
+            await wait_turn(loading)
+            await loading.edit(**kwargs)
+            return loading
+        except discord.HTTPException:
+            if kwargs['content'] is None: kwargs.pop('content') # Only the one setdefault added
+            if 'attachments' in kwargs: kwargs['files'] = kwargs.pop('attachments')
+    return await send(ctx, **kwargs)
+
+
+# --- 2. PACKING ---
+def pack_lines(lines, limit=EMBED_DESCRIPTION_LIMIT):
+    """ Joins lines into as few chunks as fit in `limit` characters each. """
+    chunks, current, size = [], [], 0
+    for line in lines:
+        line = line[:limit]
+        if current and size + len(line) + 1 > limit:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current: chunks.append("\n".join(current))
+    return chunks
+
+def pack_embeds(embeds):
+    """ Groups embeds into messages: up to 10 per message and 6000 characters in total. """
+    groups, current, size = [], [], 0
+    for embed in embeds:
+        if current and (len(current) == EMBEDS_PER_MESSAGE or size + len(embed) > EMBED_TOTAL_LIMIT):
+            groups.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += len(embed)
+    if current: groups.append(current)
+    return groups
+
+def page_embeds(title, lines, color, footer=None):
+    """ One embed per page of lines, footer shows the page number when there is more than one. """
+    chunks = pack_lines(lines) or ["-"]
+    pages = []
+    for i, chunk in enumerate(chunks):
+        embed = discord.Embed(title=title, description=chunk, color=color)
+        parts = [footer] if footer else []
+        if len(chunks) > 1: parts.append(f"Page {i + 1}/{len(chunks)}")
+        if parts: embed.set_footer(text=" | ".join(parts))
+        pages.append(embed)
+    return pages
+
+
+# --- 3. PAGES WITH BUTTONS ---
+class Paginator(discord.ui.View):
+    """ ◀ ▶ buttons that swap the message's embed in place. Only `author_id` may turn pages (None = anyone). """
+    def __init__(self, pages, author_id=None):
+        super().__init__(timeout=PAGE_TIMEOUT)
+        self.pages = pages
+        self.author_id = author_id
+        self.page = 0
+        self.message = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page == len(self.pages) - 1
+
+    async def interaction_check(self, interaction):
+        if self.author_id is None or interaction.user.id == self.author_id: return True
+        await interaction.response.send_message("Only the person who ran the command can turn pages.", ephemeral=True)
+        return False
+
+    async def _show(self, interaction, page):
+        self.page = page
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[page], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self._show(interaction, self.page + 1)
+
+    async def on_timeout(self):
+        if self.message is None: return
+        try:
+            await self.message.edit(view=None)
+        except discord.HTTPException:
+            pass
+
+async def send_pages(ctx, pages, loading=None, author_id=None, **kwargs):
+    """ Shows embed pages in one message (buttons if there is more than one page). """
+    if len(pages) == 1:
+        return await reply(ctx, loading, embed=pages[0], **kwargs)
+    view = Paginator(pages, author_id)
+    view.message = await reply(ctx, loading, embed=pages[0], view=view, **kwargs)
+    return view.message
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+# --- ⚙️ SCHEDULING HELPERS ⚙️ ---
+# Used by the Staff cog's scheduler task, which sleeps until the next deadline
+# instead of waking up every minute.
+
+
+# --- 1. CRON SPECS ("minute hour day month weekday", weekday 0 = Sunday) ---
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/')
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(x) for x in part.split('-'))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"'{text}' is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class Cron:
+    def __init__(self, spec):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron spec needs 5 fields, got '{spec}'")
+        self.spec = spec
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(f, low, high) for f, (low, high) in zip(fields, FIELD_RANGES))
+        self.minute_list = sorted(self.minutes)
+        self.hour_list = sorted(self.hours)
+        # Like real cron: if both day and weekday are restricted, either one matching is enough
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def _day_matches(self, day):
+        if day.month not in self.months: return False
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day: return weekday_ok
+        if self.any_weekday: return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after):
+        """ First matching minute strictly after `after` (a datetime). """
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in self.hour_list:
+                    for minute in self.minute_list:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start: return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron spec '{self.spec}' never matches")
+
+
+# --- 2. ADAPTIVE REFRESH INTERVAL ---
+DEFAULT_REFRESH = {
+    "normal_minutes": 60,    # Usual gap between page reloads
+    "busy_minutes": 15,      # Gap while people are using commands or a report is coming up
+    "idle_minutes": 120,     # Gap when nobody has used a command for a while
+    "idle_after_minutes": 180,
+    "busy_after_command_minutes": 10,
+    "busy_before_report_minutes": 60,
+    "stagger_seconds": 5     # Delay between clubs reloading at the same moment
+}
+
+def refresh_interval(settings, now, last_command, next_report):
+    """ Seconds between reloads right now. All times are datetimes (last_command may be None). """
+    minutes_since_command = (now - last_command).total_seconds() / 60 if last_command else None
+    minutes_to_report = (next_report - now).total_seconds() / 60
+
+    if minutes_to_report <= settings['busy_before_report_minutes']:
+        return settings['busy_minutes'] * 60
+    if minutes_since_command is not None and minutes_since_command <= settings['busy_after_command_minutes']:
+        return settings['busy_minutes'] * 60
+    if minutes_since_command is None or minutes_since_command >= settings['idle_after_minutes']:
+        return settings['idle_minutes'] * 60
+    return settings['normal_minutes'] * 60
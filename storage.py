@@ -0,0 +1,352 @@
+import os
+import csv
+import json
+import glob
+import sqlite3
+import threading
+from datetime import date
+
+# --- ⚙️ STORAGE BACKENDS ⚙️ ---
+# utils.load_json / save_json / weekly_rollover hand every read and write to one of these.
+# Each call gets the file path plus its key: (club_name, kind) where kind is "bind", "json" or "csv".
+# The key is None for files that don't belong to a club; those always stay plain files.
+
+HISTORY_HEADER = ["Date", "Name", "Total Fans", "Weekly Gain", "Daily Avg"]
+HISTORY_CHUNK_ROWS = 5000 # Rows per chunk when streaming history in or out
+
+# Weekly rollover: every club's history rows + new weekly baseline are saved together, once per
+# club per ISO week. Running it again in the same week replaces that week's save (using the
+# baseline from before it), so a retry or a second !weekly never double-counts.
+# entries: [{'club', 'history_file', 'start_file', 'fans': {name: fans} in rank order}]
+
+def week_key(date_str):
+    year, week, _ = date.fromisoformat(date_str).isocalendar()
+    return f"{year}-W{week:02d}"
+
+def weekly_rows(date_str, fans, previous):
+    """ History rows for one club: [date, name, total_fans, weekly_gain, daily_avg] """
+    rows = []
+    for name, total in fans.items():
+        gain = max(total - previous.get(name, total), 0)
+        rows.append([date_str, name, total, gain, int(gain/7)])
+    return rows
+
+
+# --- 1. PLAIN FILES (The original behaviour) ---
+class JsonStorage:
+    def load(self, filename, key=None):
+        if os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def save(self, filename, data, key=None):
+        # Write next to the target then swap it in, so a crash never leaves half a file
+        tmp = f"{filename}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp, filename)
+
+    # History is split into one CSV per month: Data/csv/<club>_weekly_history/2026-10.csv,
+    # so a range read only opens the months it needs. An old single <club>_weekly_history.csv
+    # is split up the first time it's touched.
+    def _month_files(self, filename, since=None, until=None):
+        """ Month file paths for this history, oldest first, limited to since..until (dates or months). """
+        self._split_legacy(filename)
+        folder = filename[:-len(".csv")]
+        if not os.path.isdir(folder): return []
+        months = sorted(f[:-len(".csv")] for f in os.listdir(folder) if f.endswith(".csv"))
+        return [os.path.join(folder, f"{m}.csv") for m in months
+                if (since is None or m >= since[:7]) and (until is None or m <= until[:7])]
+
+    def _month_file(self, filename, date_str):
+        folder = filename[:-len(".csv")]
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, f"{date_str[:7]}.csv")
+
+    def _read_csv(self, path):
+        if not os.path.isfile(path): return []
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return [[r[0], r[1], int(r[2]), int(r[3]), int(r[4])] for r in reader if len(r) >= 5]
+
+    def _write_csv(self, path, rows):
+        # Write next to the target then swap it in, so a crash never leaves half a file
+        tmp = f"{path}.tmp"
+        with open(tmp, mode='w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HISTORY_HEADER)
+            writer.writerows(rows)
+        os.replace(tmp, path)
+
+    def _split_legacy(self, filename):
+        if not os.path.isfile(filename): return
+        self._merge_months(filename, self._read_csv(filename))
+        os.remove(filename)
+
+    def _merge_months(self, filename, rows, drop_dates=None):
+        """ Adds rows to their month files. Rows already there for the same dates (or drop_dates) are replaced. """
+        by_month = {}
+        for r in rows: by_month.setdefault(r[0][:7], []).append(r)
+        for d in drop_dates or (): by_month.setdefault(d[:7], [])
+        for month, month_rows in by_month.items():
+            path = self._month_file(filename, month)
+            replaced = {r[0] for r in month_rows} | set(drop_dates or ())
+            existing = self._read_csv(path)
+            kept = [r for r in existing if r[0] not in replaced]
+            if len(kept) == len(existing) and os.path.isfile(path):
+                with open(path, mode='a', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerows(month_rows)
+            elif kept or month_rows:
+                self._write_csv(path, sorted(kept + month_rows, key=lambda r: r[0]))
+            elif os.path.isfile(path):
+                os.remove(path)
+
+    def iter_history(self, filename, key=None, since=None, until=None, chunk_rows=HISTORY_CHUNK_ROWS):
+        """ Lists of at most chunk_rows rows, oldest first. Only one month is in memory at a time. """
+        chunk = []
+        for path in self._month_files(filename, since, until):
+            for r in self._read_csv(path):
+                if since is not None and r[0] < since: continue
+                if until is not None and r[0] > until: continue
+                chunk.append(r)
+                if len(chunk) >= chunk_rows:
+                    yield chunk
+                    chunk = []
+        if chunk: yield chunk
+
+    def load_history(self, filename, key=None, name=None, since=None, until=None):
+        return [r for chunk in self.iter_history(filename, since=since, until=until)
+                for r in chunk if name is None or r[1] == name]
+
+    def import_history(self, filename, chunks, key=None):
+        """ Backfill. Each date in the import replaces what was stored for that date. Returns rows written. """
+        self._split_legacy(filename) # Otherwise splitting it later would overwrite the imported dates
+        written, cleared = 0, set()
+        for rows in chunks:
+            new_dates = {r[0] for r in rows} - cleared
+            cleared |= new_dates
+            # Dates seen in an earlier chunk were already cleared: keep what that chunk wrote
+            by_month = {}
+            for r in rows: by_month.setdefault(r[0][:7], []).append(r)
+            for month, month_rows in by_month.items():
+                path = self._month_file(filename, month)
+                kept = [r for r in self._read_csv(path) if r[0] not in new_dates]
+                self._write_csv(path, sorted(kept + month_rows, key=lambda r: r[0]))
+            written += len(rows)
+        return written
+
+    def rollover(self, entries, date_str, state_file):
+        """ Write-ahead: the whole batch goes into a journal first, then gets applied.
+        A crash halfway is finished by recover() (run at startup and before the next rollover). """
+        self.recover(state_file)
+        week = week_key(date_str)
+        state = self.load(state_file) # club -> {'week', 'date', 'previous'} of its last rollover
+        plan, replaced = [], {}
+        for e in entries:
+            done = state.get(e['club'])
+            replaced[e['club']] = bool(done and done['week'] == week)
+            previous = done['previous'] if replaced[e['club']] else self.load(e['start_file'])
+            plan.append({
+                'history_file': e['history_file'], 'start_file': e['start_file'], 'fans': e['fans'],
+                'rows': weekly_rows(date_str, e['fans'], previous),
+                'drop_dates': [date_str] + ([done['date']] if replaced[e['club']] else [])
+            })
+            state[e['club']] = {'week': week, 'date': date_str, 'previous': previous}
+        self.save(f"{state_file}.journal", {'state': state, 'plan': plan})
+        self.recover(state_file)
+        return replaced
+
+    def recover(self, state_file):
+        """ Applies a journal left by rollover(). Safe to run any number of times. """
+        journal = f"{state_file}.journal"
+        if not os.path.exists(journal): return False
+        batch = self.load(journal)
+        for p in batch['plan']:
+            self._replace_history(p['history_file'], p['rows'], set(p['drop_dates']))
+            self.save(p['start_file'], p['fans'])
+        self.save(state_file, batch['state'])
+        os.remove(journal)
+        return True
+
+    def _replace_history(self, filename, rows, drop_dates):
+        # Rows from an earlier save this week (or a half-written append) are dropped first
+        self._split_legacy(filename)
+        self._merge_months(filename, rows, drop_dates)
+
+
+# --- 2. SQLITE (Indexed, transactional) ---
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bindings (
+    club TEXT NOT NULL, name TEXT NOT NULL, discord_id INTEGER NOT NULL,
+    PRIMARY KEY (club, name)
+);
+CREATE INDEX IF NOT EXISTS bindings_by_user ON bindings (club, discord_id);
+
+CREATE TABLE IF NOT EXISTS weekly_start (
+    club TEXT NOT NULL, name TEXT NOT NULL, fans INTEGER NOT NULL,
+    PRIMARY KEY (club, name)
+);
+
+CREATE TABLE IF NOT EXISTS weekly_history (
+    club TEXT NOT NULL, date TEXT NOT NULL, name TEXT NOT NULL,
+    total_fans INTEGER NOT NULL, weekly_gain INTEGER NOT NULL, daily_avg INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_by_name ON weekly_history (club, name, date);
+CREATE INDEX IF NOT EXISTS history_by_date ON weekly_history (club, date);
+
+CREATE TABLE IF NOT EXISTS weekly_rollover (
+    club TEXT NOT NULL, week TEXT NOT NULL, date TEXT NOT NULL, previous TEXT NOT NULL,
+    PRIMARY KEY (club, week)
+);
+"""
+
+# kind -> (table, value column) for the two dict-shaped files
+DICT_TABLES = {"bind": ("bindings", "discord_id"), "json": ("weekly_start", "fans")}
+
+class SqliteStorage:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.is_new = not os.path.exists(db_path)
+        self.fallback = JsonStorage()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def load(self, filename, key=None):
+        if key is None or key[1] not in DICT_TABLES: return self.fallback.load(filename)
+        table, column = DICT_TABLES[key[1]]
+        with self.lock:
+            rows = self.conn.execute(f"SELECT name, {column} FROM {table} WHERE club = ?", (key[0],)).fetchall()
+        return dict(rows)
+
+    def save(self, filename, data, key=None):
+        if key is None or key[1] not in DICT_TABLES: return self.fallback.save(filename, data)
+        table, column = DICT_TABLES[key[1]]
+        with self.lock, self.conn:
+            self.conn.execute(f"DELETE FROM {table} WHERE club = ?", (key[0],))
+            self.conn.executemany(f"INSERT INTO {table} (club, name, {column}) VALUES (?, ?, ?)",
+                                  [(key[0], name, value) for name, value in data.items()])
+
+    def load_history(self, filename, key=None, name=None, since=None, until=None):
+        if key is None: return self.fallback.load_history(filename, name=name, since=since, until=until)
+        query = "SELECT date, name, total_fans, weekly_gain, daily_avg FROM weekly_history WHERE club = ?"
+        args = [key[0]]
+        if name is not None:
+            query += " AND name = ?"
+            args.append(name)
+        if since is not None:
+            query += " AND date >= ?"
+            args.append(since)
+        if until is not None:
+            query += " AND date <= ?"
+            args.append(until)
+        with self.lock:
+            return [list(r) for r in self.conn.execute(query + " ORDER BY date, rowid", args)]
+
+    def iter_history(self, filename, key=None, since=None, until=None, chunk_rows=HISTORY_CHUNK_ROWS):
+        """ Lists of at most chunk_rows rows, oldest first. Each chunk is its own short query
+        (continuing after the last (date, rowid)), so the lock is never held between chunks. """
+        if key is None:
+            yield from self.fallback.iter_history(filename, since=since, until=until, chunk_rows=chunk_rows)
+            return
+        last = (since or "", 0)
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT date, name, total_fans, weekly_gain, daily_avg, rowid FROM weekly_history"
+                    " WHERE club = ? AND (date, rowid) > (?, ?) AND date <= ? ORDER BY date, rowid LIMIT ?",
+                    (key[0], *last, until or "9999", chunk_rows)).fetchall()
+            if not rows: return
+            last = (rows[-1][0], rows[-1][5])
+            yield [list(r[:5]) for r in rows]
+
+    def import_history(self, filename, chunks, key=None):
+        """ Backfill, one transaction per chunk. Each date in the import replaces what was stored for that date. """
+        if key is None: return self.fallback.import_history(filename, chunks)
+        written, cleared = 0, set()
+        for rows in chunks:
+            new_dates = {r[0] for r in rows} - cleared
+            cleared |= new_dates
+            with self.lock, self.conn:
+                self.conn.executemany("DELETE FROM weekly_history WHERE club = ? AND date = ?",
+                                      [(key[0], d) for d in new_dates])
+                self.conn.executemany(
+                    "INSERT INTO weekly_history (club, date, name, total_fans, weekly_gain, daily_avg) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(key[0], *r) for r in rows])
+            written += len(rows)
+        return written
+
+    def rollover(self, entries, date_str, state_file=None):
+        """ Every club in one transaction: it all lands, or none of it does. """
+        week = week_key(date_str)
+        replaced = {}
+        with self.lock, self.conn:
+            for e in entries:
+                club = e['club']
+                done = self.conn.execute("SELECT date, previous FROM weekly_rollover WHERE club = ? AND week = ?",
+                                         (club, week)).fetchone()
+                replaced[club] = done is not None
+                if done:
+                    previous = json.loads(done[1])
+                    self.conn.execute("DELETE FROM weekly_history WHERE club = ? AND date IN (?, ?)", (club, done[0], date_str))
+                else:
+                    previous = dict(self.conn.execute("SELECT name, fans FROM weekly_start WHERE club = ?", (club,)))
+                    self.conn.execute("DELETE FROM weekly_history WHERE club = ? AND date = ?", (club, date_str))
+                self.conn.execute("INSERT OR REPLACE INTO weekly_rollover (club, week, date, previous) VALUES (?, ?, ?, ?)",
+                                  (club, week, date_str, json.dumps(previous)))
+                self.conn.executemany(
+                    "INSERT INTO weekly_history (club, date, name, total_fans, weekly_gain, daily_avg) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(club, *r) for r in weekly_rows(date_str, e['fans'], previous)])
+                self.conn.execute("DELETE FROM weekly_start WHERE club = ?", (club,))
+                self.conn.executemany("INSERT INTO weekly_start (club, name, fans) VALUES (?, ?, ?)",
+                                      [(club, name, fans) for name, fans in e['fans'].items()])
+        return replaced
+
+    def recover(self, state_file=None):
+        return False # SQLite's own journal already rolls back a half-finished transaction
+
+    def close(self):
+        with self.lock: self.conn.close()
+
+
+# --- 3. ONE-SHOT IMPORTER (Data/json + Data/csv -> SQLite) ---
+def import_legacy_files(db, json_path, csv_path):
+    """ Copies every existing club file into the database. Returns how many files were imported. """
+    reader = JsonStorage()
+    imported = 0
+    for suffix, kind in (("_bindings.json", "bind"), ("_weekly_start.json", "json")):
+        for path in glob.glob(os.path.join(json_path, f"*{suffix}")):
+            club = os.path.basename(path)[:-len(suffix)]
+            db.save(path, reader.load(path), key=(club, kind))
+            imported += 1
+    # Old single files and monthly folders alike
+    clubs = {os.path.basename(p)[:-len("_weekly_history.csv")] for p in glob.glob(os.path.join(csv_path, "*_weekly_history.csv"))}
+    clubs |= {os.path.basename(p)[:-len("_weekly_history")] for p in glob.glob(os.path.join(csv_path, "*_weekly_history"))}
+    for club in sorted(clubs):
+        path = os.path.join(csv_path, f"{club}_weekly_history.csv")
+        with db.lock, db.conn:
+            db.conn.execute("DELETE FROM weekly_history WHERE club = ?", (club,))
+        db.import_history(path, _read_history_files(reader, path), key=(club, "csv"))
+        imported += 1
+    return imported
+
+def _read_history_files(reader, path):
+    """ Chunks of a club's history straight from its files, one month at a time. Read-only: unlike
+    JsonStorage.iter_history it never splits the old single file. Its rows win over the month files,
+    same as when it gets split. """
+    legacy = reader._read_csv(path)
+    legacy_dates = {r[0] for r in legacy}
+    for month_file in sorted(glob.glob(os.path.join(path[:-len(".csv")], "*.csv"))):
+        rows = [r for r in reader._read_csv(month_file) if r[0] not in legacy_dates]
+        if rows: yield rows
+    if legacy: yield legacy
+
+if __name__ == '__main__':
+    # python storage.py -> re-run the import by hand (replaces what is in the database)
+    from utils import JSON_PATH, CSV_PATH, DB_FILE
+    db = SqliteStorage(DB_FILE)
+    print(f"📥 Imported {import_legacy_files(db, JSON_PATH, CSV_PATH)} files into {DB_FILE}")
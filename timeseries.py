@@ -0,0 +1,174 @@
+import os
+import json
+import zlib
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+from operator import sub
+from datetime import datetime
+
+# --- ⚙️ HOURLY FAN HISTORY ⚙️ ---
+# One sample per member per refresh: (timestamp, fans, daily, login text).
+# Stored as one file per club per month: Data/series/<club>_<YYYY-MM>.bin
+# Each member's numbers are int64 arrays, delta-encoded, and the whole file is zlib-compressed,
+# so a year of hourly samples for 60 members stays around a few MB.
+
+SERIES_PATH = "Data/series/"
+MAX_CACHED_MONTHS = 24  # Months kept in memory (across all clubs) after being read
+
+
+# --- 1. ENCODING HELPERS ---
+def _delta(values):
+    return array('q', map(sub, values, chain((0,), values)))
+
+def _undelta(deltas):
+    return array('q', accumulate(deltas))
+
+def _pack_str(text):
+    raw = text.encode('utf-8')
+    return struct.pack('<I', len(raw)) + raw
+
+def _unpack_str(buf, pos):
+    (size,) = struct.unpack_from('<I', buf, pos)
+    pos += 4
+    return buf[pos:pos + size].decode('utf-8'), pos + size
+
+
+# --- 2. ONE MEMBER, ONE MONTH ---
+class MemberSeries:
+    __slots__ = ('ts', 'fans', 'daily', 'logins')
+
+    def __init__(self):
+        self.ts = array('q')
+        self.fans = array('q')
+        self.daily = array('q')
+        self.logins = [] # Run-length encoded: [[text, count], ...]
+
+    def append(self, ts, fans, daily, login):
+        self.ts.append(ts)
+        self.fans.append(fans)
+        self.daily.append(daily)
+        if self.logins and self.logins[-1][0] == login: self.logins[-1][1] += 1
+        else: self.logins.append([login, 1])
+
+    def logins_between(self, lo, hi):
+        """ Login texts of samples lo..hi-1, expanded from the runs. """
+        out, start = [], 0
+        for text, count in self.logins:
+            a, b = max(lo, start), min(hi, start + count)
+            if a < b: out.extend([text] * (b - a))
+            start += count
+            if start >= hi: break
+        return out
+
+    def encode(self):
+        parts = [struct.pack('<I', len(self.ts))]
+        for column in (self.ts, self.fans, self.daily):
+            parts.append(_delta(column).tobytes())
+        parts.append(_pack_str(json.dumps(self.logins)))
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, buf, pos):
+        series = cls()
+        (n,) = struct.unpack_from('<I', buf, pos)
+        pos += 4
+        for attr in ('ts', 'fans', 'daily'):
+            deltas = array('q')
+            deltas.frombytes(buf[pos:pos + n * 8])
+            setattr(series, attr, _undelta(deltas))
+            pos += n * 8
+        logins, pos = _unpack_str(buf, pos)
+        series.logins = json.loads(logins)
+        return series, pos
+
+
+# --- 3. MONTH FILES ---
+def _month_of(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m")
+
+def _month_file(club, month):
+    return f"{SERIES_PATH}{club}_{month}.bin"
+
+def _months_between(since_ts, until_ts):
+    start, end = datetime.fromtimestamp(since_ts), datetime.fromtimestamp(until_ts)
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def _read_month(club, month):
+    path = _month_file(club, month)
+    members = {}
+    if not os.path.exists(path): return members
+    with open(path, 'rb') as f:
+        buf = zlib.decompress(f.read())
+    pos = 0
+    while pos < len(buf):
+        name, pos = _unpack_str(buf, pos)
+        members[name], pos = MemberSeries.decode(buf, pos)
+    return members
+
+def _write_month(club, month, members):
+    os.makedirs(SERIES_PATH, exist_ok=True)
+    buf = b"".join(_pack_str(name) + s.encode() for name, s in members.items())
+    path = _month_file(club, month)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(zlib.compress(buf))
+    os.replace(tmp, path)
+
+
+# --- 4. PUBLIC API ---
+_months = {} # (club, month) -> {name: MemberSeries}, in least-recently-used order
+_lock = threading.Lock()
+
+def _get_month(club, month):
+    key = (club, month)
+    members = _months.pop(key, None)
+    if members is None:
+        members = _read_month(club, month)
+    _months[key] = members
+    while len(_months) > MAX_CACHED_MONTHS:
+        del _months[next(iter(_months))]
+    return members
+
+def record_snapshot(club, data_list, ts=None):
+    """ Adds one sample per member (data_list = scraper output) and saves the month file. """
+    ts = int(ts if ts is not None else datetime.now().timestamp())
+    month = _month_of(ts)
+    with _lock:
+        members = _get_month(club, month)
+        for p in data_list:
+            series = members.get(p['name'])
+            if series is None:
+                series = members[p['name']] = MemberSeries()
+            elif series.ts and series.ts[-1] >= ts:
+                continue # Already have this (or a newer) sample
+            series.append(ts, p['fans'], p['daily'], p['login'])
+        _write_month(club, month, members)
+
+def member_names(club, since_ts, until_ts=None):
+    """ Every member name with at least one sample in the range. """
+    until_ts = until_ts if until_ts is not None else datetime.now().timestamp()
+    names = set()
+    with _lock:
+        for month in _months_between(since_ts, until_ts):
+            names.update(_get_month(club, month))
+    return names
+
+def query_history(club, name, since_ts, until_ts=None):
+    """ [(ts, fans, daily, login), ...] oldest first, for since_ts <= ts <= until_ts. """
+    until_ts = until_ts if until_ts is not None else datetime.now().timestamp()
+    samples = []
+    with _lock:
+        for month in _months_between(since_ts, until_ts):
+            series = _get_month(club, month).get(name)
+            if series is None: continue
+            lo = bisect_left(series.ts, since_ts)
+            hi = bisect_right(series.ts, until_ts)
+            samples.extend(zip(series.ts[lo:hi], series.fans[lo:hi], series.daily[lo:hi],
+                               series.logins_between(lo, hi)))
+    return samples
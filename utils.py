@@ -1,102 +1,316 @@
 import os
 import json
-import csv
 import time
+import socket
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
+from collections import defaultdict
+from storage import JsonStorage, SqliteStorage, import_legacy_files
+from scheduler import DEFAULT_REFRESH
+from leaderboard import Leaderboard, Dashboard
+from metrics import timed, count, observe, mark_startup
+from activity import ActivityIndex
 
 # --- ⚙️ CONFIGURATION ⚙️ ---
-CLUB_MAP = {
-    "1": 1, "lunasoul": 1, "main": 1,
-    "2": 2, "umaclover": 2, "sub": 2
-}
+# Clubs live in clubs.json (or the file in CLUB_CONFIG). Each club entry:
+#   id, name (used for file names), aliases, port (Chrome debugger), roles (club staff), channel (report channel, 0 = REPORT_CHANNEL_ID)
+CLUB_CONFIG = os.getenv('CLUB_CONFIG', 'clubs.json')
 
-CLUB_FILENAMES = {
-    1: "lunasoul",   
-    2: "umaclover"    
+DEFAULT_CONFIG = {
+    "staff_roles": ["mod", "staff"],
+    "max_parallel_scrapes": 4,
+    "clubs": [
+        {"id": 1, "name": "lunasoul", "aliases": ["main"], "port": 9222, "roles": ["ls uma officer"], "channel": 0},
+        {"id": 2, "name": "umaclover", "aliases": ["sub"], "port": 9223, "roles": ["umaclover leader"], "channel": 0}
+    ]
 }
 
+def load_club_config(path):
+    if not os.path.exists(path):
+        print(f"⚠️ {path} not found, using the built-in club list.")
+        return DEFAULT_CONFIG
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+config = load_club_config(CLUB_CONFIG)
+
+CLUBS = {c['id']: c for c in config['clubs']}                 # id -> club entry
+CLUB_FILENAMES = {c_id: c['name'] for c_id, c in CLUBS.items()}
+CLUB_PORTS = {c_id: c['port'] for c_id, c in CLUBS.items()}
+CLUB_MAP = {}                                                  # any alias -> id
+for c_id, c in CLUBS.items():
+    for alias in [str(c_id), c['name'], *c.get('aliases', [])]:
+        CLUB_MAP[alias.lower()] = c_id
+DEFAULT_CLUB = next(iter(CLUBS))
+STAFF_ROLES = {r.lower() for r in config.get('staff_roles', [])}
+for c in CLUBS.values():
+    STAFF_ROLES.update(r.lower() for r in c.get('roles', []))
+MAX_PARALLEL_SCRAPES = config.get('max_parallel_scrapes', 4)
+WEEKLY_REPORT_SPEC = "0 20 * * 0" # Cron spec: Sunday 20:00. A club can override it with "weekly_report"
+REFRESH_SETTINGS = {**DEFAULT_REFRESH, **config.get('refresh', {})}
+
+# "attach": read the Chrome windows you keep open on each club's debugger port (the original setup)
+# "headless": the bot starts its own headless Chrome, one tab per club "url". BROWSER_MODE overrides it.
+DEFAULT_BROWSER = {"mode": "attach", "max_memory_mb": 1024, "memory_check_seconds": 60, "chrome_binary": None}
+BROWSER = {**DEFAULT_BROWSER, **config.get('browser', {})}
+BROWSER_MODE = os.getenv('BROWSER_MODE', BROWSER['mode']).lower()
+
+def get_port(club_id):
+    return CLUB_PORTS[club_id]
+
 # --- 2. CLUB ID RESOLVER ---
 def resolve_club_id(user_input):
-    if user_input is None: return 1
+    if user_input is None: return DEFAULT_CLUB
     key = str(user_input).lower()
-    return CLUB_MAP.get(key, 1)
+    return CLUB_MAP.get(key, DEFAULT_CLUB)
 
 # --- 3. FILE PATHS ---
-JSON_PATH = "Data/json/"
+JSON_PATH = "Data/json/" # Created on the first read/write, not on import
 CSV_PATH = "Data/csv/"
-os.makedirs(JSON_PATH, exist_ok=True)
-os.makedirs(CSV_PATH, exist_ok=True)
 
+DB_FILE = "Data/almond.db"
+SCHEDULE_FILE = f"{JSON_PATH}scheduler_state.json" # Last time each scheduled job ran
+ROLLOVER_FILE = f"{JSON_PATH}weekly_rollover.json"   # Last weekly save per club (STORAGE_BACKEND=json)
+FILE_KEYS = {} # file path -> (club_name, kind), so the storage backend knows what a path holds
 
 def get_filenames(club_id):
     real_name = CLUB_FILENAMES.get(club_id, f"club{club_id}")
     prefix = f"{real_name}_"
-    return {
+    files = {
         "bind": f"{JSON_PATH}{prefix}bindings.json",
         "json": f"{JSON_PATH}{prefix}weekly_start.json",
-        "csv": f"{CSV_PATH}{prefix}weekly_history.csv"
+        "csv": f"{CSV_PATH}{prefix}weekly_history.csv",
+        "activity": f"{JSON_PATH}{prefix}activity.json"
     }
+    for kind, path in files.items():
+        FILE_KEYS[path] = (real_name, kind)
+    return files
 
 # --- 4. PERMISSION CHECKER ---
 def is_manager(ctx):
     if ctx.author.guild_permissions.administrator: return True
-    allowed_roles = ["mod", "staff", "ls uma officer", "umaclover leader"]
     for role in ctx.author.roles:
-        if role.name.lower() in allowed_roles: return True
+        if role.name.lower() in STAFF_ROLES: return True
     return False
 
 # --- 5. JSON LOADER & SAVERS ---
+# STORAGE_BACKEND=sqlite (default) keeps everything in Data/almond.db, =json keeps the old files.
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'sqlite').lower()
+
+storage = None # Opened by get_storage() on first use, so importing utils doesn't touch the disk
+_storage_lock = threading.Lock()
+
+def get_storage():
+    global storage
+    with _storage_lock:
+        if storage is None: storage = _open_storage()
+    return storage
+
+def _open_storage():
+    os.makedirs(JSON_PATH, exist_ok=True)
+    os.makedirs(CSV_PATH, exist_ok=True)
+    if STORAGE_BACKEND == 'json':
+        backend = JsonStorage()
+        if backend.recover(ROLLOVER_FILE): print("♻️ Finished a weekly save that was interrupted last time")
+        return backend
+    backend = SqliteStorage(DB_FILE)
+    if backend.is_new:
+        # First run on SQLite: bring over whatever the JSON/CSV files already hold
+        imported = import_legacy_files(backend, JSON_PATH, CSV_PATH)
+        if imported: print(f"📥 Imported {imported} old data files into {DB_FILE}")
+    return backend
+
+FILE_VERSIONS = {} # file path -> number of saves since startup, so caches know when to rebuild
+
 def load_json(filename):
-    if os.path.exists(filename):
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    with timed("storage.load"):
+        return get_storage().load(filename, FILE_KEYS.get(filename))
 
 def save_json(filename, data):
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4)
+    with timed("storage.save"):
+        get_storage().save(filename, data, FILE_KEYS.get(filename))
+    FILE_VERSIONS[filename] = FILE_VERSIONS.get(filename, 0) + 1
 
-def save_weekly_csv(filename, data_list, previous_data):
-    file_exists = os.path.isfile(filename)
+def weekly_rollover(club_data):
+    """ club_id -> scraped data_list. Saves every club's weekly history rows and new weekly
+    baseline in one go. Safe to repeat: a second run in the same week replaces the first.
+    Returns club_id -> True if it replaced an earlier save this week. """
     date_str = datetime.now().strftime("%Y-%m-%d")
-    with open(filename, mode='a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["Date", "Name", "Total Fans", "Weekly Gain", "Daily Avg"])
-        for p in data_list:
-            gain = p['fans'] - previous_data.get(p['name'], p['fans'])
-            if gain < 0: gain = 0
-            writer.writerow([date_str, p['name'], p['fans'], gain, int(gain/7)])
-
-# --- 6. BACKGROUND REFRESHER (Runs every 1 hour) ---
+    entries = []
+    club_data = {c_id: data_list for c_id, data_list in club_data.items() if data_list} # Nothing read = nothing to save
+    for c_id, data_list in club_data.items():
+        files = get_filenames(c_id)
+        entries.append({
+            'club': FILE_KEYS[files['csv']][0], 'history_file': files['csv'], 'start_file': files['json'],
+            'fans': {p['name']: p['fans'] for p in data_list}
+        })
+    with timed("storage.rollover"):
+        replaced = get_storage().rollover(entries, date_str, ROLLOVER_FILE)
+    for e in entries:
+        for filename in (e['history_file'], e['start_file']):
+            FILE_VERSIONS[filename] = FILE_VERSIONS.get(filename, 0) + 1
+    return {c_id: replaced[e['club']] for c_id, e in zip(club_data, entries)}
+
+def load_weekly_history(filename, name=None, since=None, until=None):
+    """ Rows of [date, name, total_fans, weekly_gain, daily_avg], oldest first. """
+    with timed("storage.history_read"):
+        return get_storage().load_history(filename, FILE_KEYS.get(filename), name=name, since=since, until=until)
+
+def iter_weekly_history(filename, since=None, until=None):
+    """ Same rows as load_weekly_history, a chunk at a time (for exports). """
+    return get_storage().iter_history(filename, FILE_KEYS.get(filename), since=since, until=until)
+
+def import_weekly_history(filename, chunks):
+    """ Backfills history from chunks of rows. Dates in the import replace the stored ones. Returns rows written. """
+    with timed("storage.history_import"):
+        written = get_storage().import_history(filename, chunks, FILE_KEYS.get(filename))
+    FILE_VERSIONS[filename] = FILE_VERSIONS.get(filename, 0) + 1
+    return written
+
+_club_histories = {} # club_id -> (history file version, ClubHistory)
+
+def get_club_history(club_id):
+    """ The club's weekly history as NumPy arrays (analytics.ClubHistory), rebuilt only after a new weekly save. """
+    history_file = get_filenames(club_id)['csv']
+    version = FILE_VERSIONS.get(history_file, 0)
+    cached = _club_histories.get(club_id)
+    if cached and cached[0] == version:
+        return cached[1]
+    from analytics import ClubHistory
+    with timed("analytics.build"):
+        history = ClubHistory(load_weekly_history(history_file))
+    _club_histories[club_id] = (version, history)
+    return history
+
+# --- 6. BACKGROUND REFRESHER (Run by the Staff scheduler) ---
+PAGE_READY_TIMEOUT = 20   # Seconds to wait for the reloaded page before giving up
+PAGE_READY_POLL = 0.25    # Seconds between checks
+PAGE_STABLE_POLLS = 3     # Checks in a row with nothing changing = page is ready
+
+# [load state, member rows on the page, network requests made so far]
+PAGE_STATE_JS = """
+return [document.readyState,
+        document.getElementsByClassName('club-member-row-container').length,
+        performance.getEntriesByType('resource').length];
+"""
+
+refresh_times = {} # port -> seconds the last successful reload took
+
+def wait_for_page_ready(driver, timeout=PAGE_READY_TIMEOUT):
+    """ Waits until the page finished loading, has member rows, and neither the row count
+    nor the number of network requests changed for PAGE_STABLE_POLLS checks. Returns seconds waited. """
+    start = time.monotonic()
+    last_state, stable = None, 0
+    while True:
+        state = driver.execute_script(PAGE_STATE_JS)
+        if state[0] == 'complete' and state[1] > 0 and state == last_state: stable += 1
+        else: stable = 0
+        if stable >= PAGE_STABLE_POLLS:
+            return time.monotonic() - start
+        if time.monotonic() - start > timeout:
+            raise TimeoutError(f"page not ready after {timeout}s (state: {state})")
+        last_state = state
+        time.sleep(PAGE_READY_POLL)
+
 def perform_background_refresh(port_number):
     print(f"🔄 Background Refresh: Port {port_number}...")
-    chrome_options = Options()
-    chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{port_number}")
-    
+    count("refreshes")
     try:
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = get_driver(port_number)
+        start = time.monotonic()
         # REFRESH HAPPENS HERE ONLY
         driver.refresh()
-        time.sleep(5) # Wait for load
+        wait_for_page_ready(driver)
+        # Scroll so rows that load lazily show up too, then wait for them to settle
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
-        print(f"✅ Port {port_number} Refreshed.")
+        wait_for_page_ready(driver)
+        refresh_times[port_number] = time.monotonic() - start
+        observe("scrape.refresh", refresh_times[port_number] * 1000)
+        print(f"✅ Port {port_number} Refreshed in {refresh_times[port_number]:.1f}s.")
+    except TimeoutError as e:
+        count("refresh_failures")
+        print(f"⚠️ Refresh Slow on Port {port_number}: {e}")
     except Exception as e:
+        count("refresh_failures")
+        drop_driver(port_number)
         print(f"⚠️ Refresh Failed on Port {port_number}: {e}")
 
 # --- 7. THE READER (Runs when you type !profile) ---
+FAST_EXTRACT = os.getenv('FAST_EXTRACT', '1') != '0'  # Set to 0 to always use the old per-element reader
+
+# Runs inside the page and returns every row in ONE WebDriver call.
+# One entry per row: [name, fans, daily, login], or null if the row doesn't have the usual cells.
+EXTRACT_ROWS_JS = """
+const rows = document.getElementsByClassName('club-member-row-container');
+return Array.from(rows, row => {
+    const name = row.getElementsByClassName('club-profile-name')[0];
+    const stats = row.getElementsByClassName('club-profile-cell-reg-span');
+    if (!name || stats.length < 3) return null;
+    return [name.innerText, stats[0].innerText, stats[1].innerText, stats[2].innerText];
+});
+"""
+
+def parse_member(name, fans_text, daily_text, login_text):
+    """ Turns the 4 raw cell texts into a member dict. Raises ValueError on a bad fan count. """
+    fan_number = int(fans_text.replace(",", ""))
+    daily_str = daily_text.replace(",", "")
+    daily_avg = int(daily_str) if daily_str.isdigit() else 0
+    return {'name': name.strip(), 'fans': fan_number, 'daily': daily_avg, 'login': login_text}
+
+def extract_members_js(driver):
+    """ Fast path. Returns (row_count, members) or None if the page layout looks different. """
+    rows = driver.execute_script(EXTRACT_ROWS_JS)
+    if not isinstance(rows, list): return None
+    cells = [r for r in rows if r]
+    if rows and not cells: return None # Rows exist but none matched -> let the slow path try
+    raw_data = []
+    for r in cells:
+        try: raw_data.append(parse_member(*r))
+        except (ValueError, TypeError): continue
+    return len(rows), raw_data
+
+def extract_members_elements(driver):
+    """ Slow path (one WebDriver call per cell). Returns (row_count, members). """
+    from selenium.webdriver.common.by import By
+    rows = driver.find_elements(By.CLASS_NAME, "club-member-row-container")
+    raw_data = []
+    for row in rows:
+        try:
+            name = row.find_element(By.CLASS_NAME, "club-profile-name").text
+            stats = row.find_elements(By.CLASS_NAME, "club-profile-cell-reg-span")
+            if len(stats) >= 3:
+                raw_data.append(parse_member(name, stats[0].text, stats[1].text, stats[2].text))
+        except: continue
+    return len(rows), raw_data
+
+def extract_members(driver):
+    result = None
+    if FAST_EXTRACT:
+        try:
+            with timed("scrape.extract_js"): result = extract_members_js(driver)
+        except Exception as e: print(f"⚠️ Fast extract failed, using fallback: {e}")
+    if result is None:
+        count("scrape_extract_fallbacks")
+        with timed("scrape.extract_elements"): result = extract_members_elements(driver)
+    return result
+
+NO_MEMBERS_ERROR = "No members found (Browser might be refreshing? Try again in 5s)." # Chrome answered, page not ready
+
 def read_browser_and_sort(port_number):
+    count("scrapes")
+    with timed("scrape.read"):
+        club_name, result = _read_browser_and_sort(port_number) # Raises PortBackingOff, see _connect_driver
+    if club_name is None: count("scrape_failures")
+    return club_name, result
+
+def _read_browser_and_sort(port_number):
     
     # Notice: NO REFRESH CODE HERE! It just looks at what is already there.
     print(f"👀 Reading Chrome on Port {port_number}...")
-    chrome_options = Options()
-    chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{port_number}")
     try:
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = get_driver(port_number)
         try: 
             full_title = driver.title
             if "|" in full_title:
@@ -105,21 +319,530 @@ def read_browser_and_sort(port_number):
                 club_name = "Club"
         except: club_name = "Club"
         
-        rows = driver.find_elements(By.CLASS_NAME, "club-member-row-container")
-        if not rows: return None, "No members found (Browser might be refreshing? Try again in 5s)."
-        
-        raw_data = []
-        for row in rows:
-            try:
-                name = row.find_element(By.CLASS_NAME, "club-profile-name").text.strip()
-                stats = row.find_elements(By.CLASS_NAME, "club-profile-cell-reg-span")
-                if len(stats) >= 3:
-                    fan_number = int(stats[0].text.replace(",", ""))
-                    daily_str = stats[1].text.replace(",", "")
-                    daily_avg = int(daily_str) if daily_str.isdigit() else 0
-                    login_time = stats[2].text
-                    raw_data.append({'name': name, 'fans': fan_number, 'daily': daily_avg, 'login': login_time})
-            except: continue 
+        row_count, raw_data = extract_members(driver)
+        if not row_count: return None, NO_MEMBERS_ERROR
         return club_name, sorted(raw_data, key=lambda x: x['fans'], reverse=True)
+    except PortBackingOff:
+        raise # No connect was tried, so there's no broken session to drop or failure to report
     except Exception as e:
-        return None, f"Error: Port {port_number} not found. ({e})"
\ No newline at end of file
+        drop_driver(port_number)
+        return None, f"Error: Port {port_number} not found. ({e})"
+
+# --- 8. ASYNC SCRAPING LAYER (Keeps the bot responsive while Chrome is driven) ---
+SCRAPE_WORKERS = MAX_PARALLEL_SCRAPES  # Max Selenium calls running at the same time
+PORT_CONCURRENCY = 1    # One Chrome tab can only be driven by one call at a time
+SCRAPE_TIMEOUT = 30     # Seconds before a read gives up
+REFRESH_TIMEOUT = 60    # Seconds before a reload gives up
+
+_scrape_pool = ThreadPoolExecutor(max_workers=SCRAPE_WORKERS, thread_name_prefix="scraper")
+_port_limits = {}
+_port_stuck = set() # ports whose timed-out call is still running in its thread
+
+def _limit_key(port_number):
+    # Headless mode drives every club through one browser session, so clubs take turns
+    return HEADLESS_KEY if BROWSER_MODE == 'headless' else port_number
+
+def _port_limit(key):
+    if key not in _port_limits:
+        _port_limits[key] = asyncio.Semaphore(PORT_CONCURRENCY)
+    return _port_limits[key]
+
+def _job_done(key, limit):
+    _port_stuck.discard(key)
+    limit.release()
+
+async def _run_on_port(port_number, timeout, func, *args):
+    """ Runs func(*args) in the scrape pool, one call per port at a time. A timeout can't stop the
+    thread, so the port stays locked until the thread really finishes (WebDriver isn't thread-safe)
+    and new calls fail fast with ConnectionError meanwhile. """
+    key = _limit_key(port_number)
+    if key in _port_stuck:
+        count("port_busy_fails")
+        raise ConnectionError(f"Port {port_number} is still busy with a read that timed out")
+    limit = _port_limit(key)
+    await limit.acquire()
+    loop = asyncio.get_running_loop()
+    try:
+        job = _scrape_pool.submit(func, *args)
+    except BaseException:
+        limit.release()
+        raise
+
+    def finished(_):
+        try: loop.call_soon_threadsafe(_job_done, key, limit)
+        except RuntimeError: pass # Loop already closed (shutdown)
+    job.add_done_callback(finished)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+    except asyncio.TimeoutError:
+        if not job.done(): _port_stuck.add(key)
+        raise
+
+async def for_each_club(func, club_ids=None):
+    """ Runs `await func(club_id)` for every club concurrently (max MAX_PARALLEL_SCRAPES at once).
+    Results come back in club order. The limit is per call, so one caller's slow reloads
+    don't hold up another caller that can be served from the cache. """
+    fan_out = asyncio.Semaphore(MAX_PARALLEL_SCRAPES)
+    async def run(c_id):
+        async with fan_out:
+            return await func(c_id)
+    return await asyncio.gather(*(run(c_id) for c_id in (club_ids or CLUBS)))
+
+async def scrape_club(port_number):
+    """ Async version of read_browser_and_sort. Same (title, data) / (None, error) result.
+    Also tells the port's circuit breaker how it went: only connect/WebDriver errors and timeouts
+    count as failures, a page that is still loading doesn't. """
+    try:
+        result = await _run_on_port(port_number, SCRAPE_TIMEOUT, read_browser_and_sort, port_number)
+    except asyncio.TimeoutError:
+        count("scrape_timeouts")
+        error = f"Error: Port {port_number} timed out after {SCRAPE_TIMEOUT}s."
+        _record_read(port_number, False, error)
+        return None, error
+    except ConnectionError as e:
+        # Still busy with a read that timed out, or reconnects are backing off: the failure
+        # that caused it was already counted, so don't count it again
+        return None, f"Error: {e}."
+    if result[0] is None and result[1] != NO_MEMBERS_ERROR: _record_read(port_number, False, result[1])
+    else: _record_read(port_number, True)
+    return result
+
+async def refresh_club(port_number):
+    """ Async version of perform_background_refresh. While it runs, readers get the last good snapshot. """
+    if not port_available(port_number):
+        print(f"⏭️ Skipping reload of Port {port_number}, it isn't answering.")
+        return
+    _refreshing.add(port_number)
+    try:
+        await _run_on_port(port_number, REFRESH_TIMEOUT, perform_background_refresh, port_number)
+    except asyncio.TimeoutError:
+        print(f"⚠️ Refresh Timed Out on Port {port_number} after {REFRESH_TIMEOUT}s.")
+    except ConnectionError as e:
+        print(f"⚠️ Refresh Skipped on Port {port_number}: {e}")
+    finally:
+        _refreshing.discard(port_number)
+
+# --- 8b. PORT HEALTH (Circuit breaker: a dead Chrome fails fast instead of timing out every command) ---
+BREAKER_THRESHOLD = 3      # Failed reads in a row before a port is skipped
+BREAKER_BACKOFF = (15, 300) # Seconds a port is skipped: starts at 15, doubles every time it fails again, max 300
+PROBE_TIMEOUT = 0.5        # Seconds for the quick "is Chrome listening at all" check before attaching
+
+_port_health = {} # port -> {'failures', 'trips', 'open_until', 'last_error'}
+
+def _health(port_number):
+    return _port_health.setdefault(port_number, {'failures': 0, 'trips': 0, 'open_until': 0.0, 'last_error': None})
+
+def port_available(port_number):
+    """ False while the port is being skipped because its last reads kept failing. """
+    return time.monotonic() >= _health(port_number)['open_until']
+
+def _record_read(port_number, ok, error=None):
+    health = _health(port_number)
+    if ok:
+        if health['trips']: print(f"✅ Port {port_number} is answering again.")
+        health.update(failures=0, trips=0, open_until=0.0, last_error=None)
+        return
+    health['failures'] += 1
+    health['last_error'] = error
+    if health['failures'] >= BREAKER_THRESHOLD:
+        # After the wait, the next read is a single trial: one more failure skips the port again, for longer
+        wait = min(BREAKER_BACKOFF[0] * 2 ** health['trips'], BREAKER_BACKOFF[1])
+        health['trips'] += 1
+        health['open_until'] = time.monotonic() + wait
+        count("breaker_trips")
+        print(f"🔌 Port {port_number} failed {health['failures']} reads in a row, skipping it for {wait}s.")
+
+def port_health():
+    """ port -> "ok" / "failing (n)" / "skipped for Ns", for !perf. """
+    states = {}
+    for port_number, health in _port_health.items():
+        left = health['open_until'] - time.monotonic()
+        if left > 0: states[port_number] = f"skipped for {left:.0f}s"
+        elif health['failures']: states[port_number] = f"failing ({health['failures']})"
+        else: states[port_number] = "ok"
+    return states
+
+def stale_note(port_number):
+    """ Warning to show with the data when it comes from an older read because the port isn't answering. """
+    health = _port_health.get(port_number)
+    if not health or not health['failures'] or port_number not in _snapshots: return None
+    return f"⚠️ Chrome not answering, showing data from {format_age(snapshot_age(port_number))}"
+
+# --- 9. SNAPSHOT CACHE (Commands read from memory, not from Chrome) ---
+SNAPSHOT_TTL = int(os.getenv('SNAPSHOT_TTL', 300))  # Seconds before a cached read is considered old
+
+_snapshots = {}   # port -> (monotonic time, (club_title, data))
+_in_flight = {}   # port -> Task of the scrape currently filling the cache
+_refreshing = set() # ports whose page is being reloaded right now
+_leaderboards = defaultdict(Leaderboard) # port -> ranking maintained across scrapes
+change_listeners = [] # func(port, events), called after every scrape that changed something
+_activity = {} # club_id -> ActivityIndex (last login times, kept up to date by every scrape)
+club_dashboard = Dashboard() # Totals across all clubs, each scrape updates its own club's share
+
+async def _fill_snapshot(port_number):
+    try:
+        if not port_available(port_number):
+            count("breaker_fast_fails")
+            left = _health(port_number)['open_until'] - time.monotonic()
+            return None, f"Error: Port {port_number} isn't answering, trying again in {left:.0f}s."
+        result = await scrape_club(port_number)
+        if result[0] is not None:
+            _snapshots[port_number] = (time.monotonic(), result)
+            clubs_here = [c_id for c_id in CLUBS if get_port(c_id) == port_number]
+            for c_id in clubs_here:
+                get_activity(c_id).update(result[1], time.time())
+            events = _leaderboards[port_number].apply(result[1])
+            for c_id in clubs_here:
+                club_dashboard.update(CLUB_FILENAMES[c_id], _leaderboards[port_number])
+            if events:
+                for listener in change_listeners:
+                    try: listener(port_number, events)
+                    except Exception as e: print(f"⚠️ Change listener failed: {e}")
+        return result
+    finally:
+        _in_flight.pop(port_number, None)
+
+async def get_snapshot(port_number, max_age=SNAPSHOT_TTL, allow_stale=True):
+    """ Cached read_browser_and_sort. Concurrent misses share one scrape. Do not mutate the result.
+    allow_stale: while the page is reloading, or if the read fails, return the last good snapshot instead. """
+    cached = _snapshots.get(port_number)
+    if cached and (time.monotonic() - cached[0] < max_age or (allow_stale and port_number in _refreshing)):
+        count("cache_hits")
+        return cached[1]
+    count("cache_misses")
+    task = _in_flight.get(port_number)
+    if task is not None:
+        count("cache_coalesced")
+    else:
+        task = asyncio.ensure_future(_fill_snapshot(port_number))
+        _in_flight[port_number] = task
+    # shield: one impatient caller being cancelled must not cancel the others' scrape
+    result = await asyncio.shield(task)
+    if result[0] is None and allow_stale and port_number in _snapshots:
+        count("cache_stale_served")
+        return _snapshots[port_number][1] # Last good read beats an error message
+    return result
+
+def get_leaderboard(port_number):
+    """ Ranking and totals kept up to date by every scrape (call after get_snapshot). """
+    return _leaderboards[port_number]
+
+def get_activity(club_id):
+    """ The club's ActivityIndex: last seen times from the latest scrape, loaded from disk at first use. """
+    index = _activity.get(club_id)
+    if index is None:
+        index = _activity[club_id] = ActivityIndex.from_dict(load_json(get_filenames(club_id)['activity']))
+    return index
+
+def activity_to_save(club_id):
+    """ (file, data) if the club's activity changed since the last call, else None. Call from the event loop. """
+    index = _activity.get(club_id)
+    if index is None or not index.dirty: return None
+    index.dirty = False
+    return get_filenames(club_id)['activity'], index.to_dict()
+
+def snapshot_version(port_number):
+    """ Changes every time the cached snapshot is replaced. """
+    cached = _snapshots.get(port_number)
+    return None if cached is None else cached[0]
+
+def snapshot_age(port_number):
+    """ Seconds since the cached snapshot was taken, or None if there is none. """
+    cached = _snapshots.get(port_number)
+    return None if cached is None else time.monotonic() - cached[0]
+
+def format_age(seconds):
+    if seconds is None or seconds < 60: return "just now"
+    if seconds < 3600: return f"{int(seconds // 60)}m ago"
+    return f"{int(seconds // 3600)}h ago"
+
+# --- 10. DRIVER POOL (One reused WebDriver session per port) ---
+HEALTH_CHECK_AFTER = 30                 # Seconds idle before a session is pinged before reuse
+RECONNECT_BACKOFF = [1, 2, 5, 10, 30]   # Seconds to wait after 1, 2, 3... failed connects in a row
+
+_drivers = {}          # port -> [driver, monotonic time of last use]
+_connect_failures = {} # port -> (failures in a row, monotonic time of last failure)
+_driver_lock = threading.Lock()
+_driver_stats = {'connects': 0, 'reuses': 0, 'connect_failures': 0, 'connect_ms': 0.0}
+
+class PortBackingOff(ConnectionError):
+    """ A connect wasn't even tried because the last ones failed (RECONNECT_BACKOFF). """
+
+def _attach(port_number):
+    # Nothing listening on the port: fail in milliseconds instead of waiting for chromedriver to give up
+    socket.create_connection(("127.0.0.1", port_number), timeout=PROBE_TIMEOUT).close()
+    # Selenium is imported on the first connect, not at startup (it's the slowest import we have)
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{port_number}")
+    return webdriver.Chrome(options=chrome_options)
+
+def _connect_driver(port_number, launch=_attach):
+    failures, last_fail = _connect_failures.get(port_number, (0, 0))
+    if failures:
+        wait = RECONNECT_BACKOFF[min(failures, len(RECONNECT_BACKOFF)) - 1]
+        left = wait - (time.monotonic() - last_fail)
+        if left > 0:
+            raise PortBackingOff(f"Port {port_number} is backing off, retry in {left:.0f}s")
+
+    start = time.monotonic()
+    try:
+        driver = launch(port_number)
+    except Exception:
+        with _driver_lock:
+            _connect_failures[port_number] = (failures + 1, time.monotonic())
+            _driver_stats['connect_failures'] += 1
+        raise
+    elapsed_ms = (time.monotonic() - start) * 1000
+    observe("driver.connect", elapsed_ms)
+    with _driver_lock:
+        _connect_failures.pop(port_number, None)
+        _driver_stats['connects'] += 1
+        _driver_stats['connect_ms'] += elapsed_ms
+    label = "headless Chrome" if port_number == HEADLESS_KEY else f"Port {port_number}"
+    print(f"🔌 Connected to {label} in {elapsed_ms:.0f} ms")
+    return driver
+
+def _is_alive(driver):
+    try:
+        driver.current_window_handle
+        return True
+    except Exception:
+        return False
+
+def get_driver(port_number):
+    """ Live WebDriver session for this port. Reuses the pooled one when it still answers. """
+    if BROWSER_MODE == 'headless': return _get_headless_tab(port_number)
+    entry = _drivers.get(port_number)
+    if entry:
+        driver, last_used = entry
+        if time.monotonic() - last_used < HEALTH_CHECK_AFTER or _is_alive(driver):
+            entry[1] = time.monotonic()
+            with _driver_lock: _driver_stats['reuses'] += 1
+            return driver
+        drop_driver(port_number)
+
+    driver = _connect_driver(port_number)
+    with _driver_lock: _drivers[port_number] = [driver, time.monotonic()]
+    return driver
+
+def _close_driver(driver):
+    # Stop only our chromedriver process. quit() could close the tabs of the Chrome we attached to.
+    try: driver.service.stop()
+    except Exception: pass
+
+def drop_driver(port_number):
+    """ Forget a broken session so the next call reconnects. """
+    if BROWSER_MODE == 'headless':
+        # One bad read doesn't mean the whole browser is gone; only restart if it stopped answering
+        with _headless_lock:
+            if _headless['driver'] is not None and not _is_alive(_headless['driver']): _quit_headless()
+        return
+    with _driver_lock: entry = _drivers.pop(port_number, None)
+    if entry: _close_driver(entry[0])
+
+def driver_stats():
+    with _driver_lock: stats = dict(_driver_stats)
+    uses = stats['connects'] + stats['reuses']
+    stats['reuse_rate'] = stats['reuses'] / uses if uses else 0.0
+    stats['avg_connect_ms'] = stats['connect_ms'] / stats['connects'] if stats['connects'] else 0.0
+    stats['open_sessions'] = len(_drivers) + (_headless['driver'] is not None)
+    return stats
+
+def shutdown_scraper():
+    """ Called once when the bot closes. """
+    for port_number in list(_drivers):
+        drop_driver(port_number)
+    _quit_headless()
+    _scrape_pool.shutdown(wait=False, cancel_futures=True)
+    stats = driver_stats()
+    print(f"🔌 Driver pool closed. {stats['connects']} connects, reuse rate {stats['reuse_rate']:.0%}, "
+          f"avg connect {stats['avg_connect_ms']:.0f} ms")
+
+# --- 10b. HEADLESS BROWSER (BROWSER_MODE=headless: no visible Chrome needed) ---
+HEADLESS_KEY = "headless"
+HEADLESS_ARGS = [
+    "--headless=new", "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu",
+    "--disable-extensions", "--blink-settings=imagesEnabled=false", "--window-size=1280,2000"
+]
+
+_headless = {'driver': None, 'tabs': {}, 'memory_checked': 0.0} # tabs: port -> window handle
+_headless_lock = threading.RLock() # Launch, restart and quit one at a time, so there is never a second Chrome
+
+def _launch_headless(key):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    for arg in HEADLESS_ARGS:
+        chrome_options.add_argument(arg)
+    if BROWSER['chrome_binary']: chrome_options.binary_location = BROWSER['chrome_binary']
+    # Don't wait for every tab to finish loading: a read that comes too early just finds no rows yet
+    chrome_options.page_load_strategy = 'eager'
+    driver = webdriver.Chrome(options=chrome_options)
+
+    # One tab per club, opened on the club's page
+    tabs = {}
+    try:
+        for c in CLUBS.values():
+            if not c.get('url'):
+                print(f"⚠️ Club {c['name']} has no \"url\" in {CLUB_CONFIG}, it can't be read in headless mode.")
+                continue
+            if tabs: driver.switch_to.new_window('tab')
+            driver.get(c['url'])
+            tabs[c['port']] = driver.current_window_handle
+    except Exception:
+        driver.quit() # Never leave a half-started Chrome running
+        raise
+    _headless['tabs'] = tabs
+    _headless['memory_checked'] = time.monotonic()
+    return driver
+
+def _quit_headless():
+    with _headless_lock:
+        driver, _headless['driver'] = _headless['driver'], None
+        _headless['tabs'] = {}
+        if driver is not None:
+            # This Chrome is ours, so quit() it completely
+            try: driver.quit()
+            except Exception: pass
+
+def _process_tree_rss_mb(root_pid):
+    """ Resident memory (MB) of a process and all its children, read from /proc. None if /proc isn't there. """
+    try: entries = os.listdir('/proc')
+    except OSError: return None
+    children, rss_pages = defaultdict(list), {}
+    for entry in entries:
+        if not entry.isdigit(): continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            children[int(fields[1])].append(int(entry))
+            rss_pages[int(entry)] = int(fields[21])
+        except (OSError, ValueError, IndexError): continue
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def _get_headless_tab(port_number):
+    with _headless_lock:
+        return _headless_tab(port_number)
+
+def _headless_tab(port_number):
+    driver = _headless['driver']
+    if driver is not None and not _is_alive(driver):
+        print("💥 Headless Chrome stopped responding, restarting it...")
+        _quit_headless()
+        driver = None
+
+    if driver is not None and time.monotonic() - _headless['memory_checked'] > BROWSER['memory_check_seconds']:
+        _headless['memory_checked'] = time.monotonic()
+        used = _process_tree_rss_mb(driver.service.process.pid)
+        if used and used > BROWSER['max_memory_mb']:
+            print(f"🧹 Headless Chrome uses {used:.0f} MB (cap {BROWSER['max_memory_mb']} MB), restarting it...")
+            _quit_headless()
+            driver = None
+
+    if driver is None:
+        driver = _headless['driver'] = _connect_driver(HEADLESS_KEY, _launch_headless)
+    else:
+        with _driver_lock: _driver_stats['reuses'] += 1
+
+    handle = _headless['tabs'].get(port_number)
+    if handle is None: raise ConnectionError(f"No headless tab for port {port_number} (missing club url?)")
+    driver.switch_to.window(handle)
+    return driver
+
+# --- 11. PLAYER INDEX (Fast name / Discord user lookups per club) ---
+class PlayerIndex:
+    """ Built from one club's bindings + snapshot. Rebuilt only when one of them changes. """
+
+    def __init__(self, bindings, club_title, members):
+        self.club_title = club_title
+        self.members = members # Already sorted by fans, so index + 1 = rank
+        self.bindings = bindings
+        self.names_by_uid = defaultdict(list) # Discord ID -> linked in-game names
+        self.uid_by_fold = {}                 # casefolded linked name -> Discord ID
+        for name, uid in bindings.items():
+            self.names_by_uid[uid].append(name)
+            self.uid_by_fold.setdefault(name.casefold(), uid)
+
+        self.folded = [p['name'].casefold() for p in members]
+        self.trigrams = defaultdict(set)      # 3 letters -> member positions containing them
+        for i, name in enumerate(self.folded):
+            for j in range(len(name) - 2):
+                self.trigrams[name[j:j + 3]].add(i)
+
+    def search_terms(self, target):
+        """ A Discord user -> their linked names. A typed name -> itself plus its linked aliases. """
+        if isinstance(target, int):
+            return list(self.names_by_uid.get(target, []))
+        terms = [target]
+        uid = self.bindings.get(target)
+        if uid is not None:
+            terms += [n for n in self.names_by_uid[uid] if n != target]
+        return terms
+
+    def _positions(self, term):
+        term = term.casefold()
+        if len(term) < 3:
+            candidates = range(len(self.folded))
+        else:
+            grams = [self.trigrams.get(term[j:j + 3], set()) for j in range(len(term) - 2)]
+            candidates = set.intersection(*grams)
+        return [i for i in candidates if term in self.folded[i]]
+
+    def find(self, terms):
+        """ Best ranked member whose name contains any of the terms: (rank, member) or None. """
+        best = None
+        for term in terms:
+            for i in self._positions(term):
+                if best is None or i < best: best = i
+        return None if best is None else (best + 1, self.members[best])
+
+    def discord_id(self, real_name):
+        uid = self.bindings.get(real_name)
+        return uid if uid is not None else self.uid_by_fold.get(real_name.casefold())
+
+_player_indexes = {} # club_id -> (version key, PlayerIndex)
+
+async def get_player_index(club_id, port_number):
+    """ PlayerIndex for the club, or None if the club can't be read. """
+    club_title, data = await get_snapshot(port_number)
+    if club_title is None: return None
+    bind_file = get_filenames(club_id)['bind']
+    version = (snapshot_version(port_number), FILE_VERSIONS.get(bind_file, 0))
+    cached = _player_indexes.get(club_id)
+    if cached and cached[0] == version:
+        return cached[1]
+    index = PlayerIndex(load_json(bind_file), club_title, data)
+    _player_indexes[club_id] = (version, index)
+    return index
+
+# --- 12. STARTUP WARM-UP (Runs in the background once the bot is online) ---
+_warm_up_task = None
+
+def start_warm_up():
+    """ Starts the warm-up once and returns its task (later calls get the same task). """
+    global _warm_up_task
+    if _warm_up_task is None: _warm_up_task = asyncio.ensure_future(_warm_up())
+    return _warm_up_task
+
+async def _warm_up():
+    """ Opens storage, connects to every club's Chrome and fills the caches, so the first
+    commands after a restart are answered from memory. Returns phase -> ms. """
+    phases = {}
+    async def phase(name, work):
+        start = time.perf_counter()
+        try: await work()
+        except Exception as e: print(f"⚠️ Warm-up step '{name}' failed: {e}")
+        phases[name] = (time.perf_counter() - start) * 1000
+        mark_startup(f"warm_up.{name}", phases[name])
+
+    await phase("storage", lambda: asyncio.to_thread(lambda: [get_activity(c_id) for c_id in CLUBS]))
+    await phase("first_read", lambda: for_each_club(lambda c_id: get_snapshot(get_port(c_id))))
+    await phase("player_index", lambda: for_each_club(lambda c_id: get_player_index(c_id, get_port(c_id))))
+    return phases